@@ -1,20 +1,20 @@
 import pandas as pd
 from pathlib import Path
 import yaml
+from ..common.io import read_bars
 
 def load_config(p: str | Path) -> dict:
     with open(p, "r") as f:
         return yaml.safe_load(f) or {}
 
-def load_data(data_path: str | Path, include: list[str] | None) -> pd.DataFrame:
-    df = pd.read_csv(data_path, parse_dates=["Date"], low_memory=False, dtype={"Ticker": "string"})
+def load_data(data_path: str | Path, include: list[str] | None, since=None) -> pd.DataFrame:
+    # include/since are applied per row chunk, so excluded tickers never accumulate
+    df = read_bars(data_path, include=include or None, since=since)
     # force numerics
     for col in ["Open", "High", "Low", "Close", "Volume"]:
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors="coerce")
     df = df.dropna(subset=["Date", "Open", "High", "Low", "Close"])  # keep NaN Volume if any
-    if include:
-        df = df[df["Ticker"].isin(include)]
     return df.sort_values(["Ticker", "Date"]).reset_index(drop=True)
 
 def read_include_file(p: str | Path) -> list[str]:
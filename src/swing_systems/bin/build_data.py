@@ -9,8 +9,15 @@ import pandas as pd
 import yfinance as yf
 import requests
 import yaml
+from ..common.adjustments import (ADJUST_MODES, adjusted_view, compute_factors, extract_actions,
+                                  load_actions, merge_actions, save_actions, unsplit)
+from ..common.io import atomic_to_csv, atomic_write_text
+from ..common.trading_calendar import get_calendar
 
 
+BAR_COLS = ["Date", "Ticker", "Open", "High", "Low", "Close", "Volume"]
+ACTION_SRC = ["Dividends", "Stock Splits"]
+
 # ---------- HELPERS ----------
 
 def load_cfg(p):
@@ -29,12 +36,69 @@ def get_sp500_list():
 
 
 def last_trading_day(d: dt.date) -> dt.date:
-    wd = d.weekday()
-    if wd == 5:  # Saturday
-        return d - dt.timedelta(days=1)
-    if wd == 6:  # Sunday
-        return d - dt.timedelta(days=2)
-    return d
+    """Latest exchange session on or before d (weekends and holidays roll back)."""
+    return get_calendar().previous_session(d).date()
+
+
+def trim_store(have: pd.DataFrame, actions: pd.DataFrame, tickers, start: str):
+    """
+    Keep only the tickers being fetched and bars/actions from `start` on. The store
+    persists between runs, so without this it grows by a day (and by every ticker
+    that ever left the universe) on each run. Actions before the first kept bar
+    no longer scale any bar, so they go too.
+    """
+    if have.empty:
+        return have, actions
+    keep = set(tickers)
+    start_ts = pd.Timestamp(start)
+    have = have[have["Ticker"].isin(keep) & (pd.to_datetime(have["Date"]) >= start_ts)]
+    actions = actions[actions["Ticker"].isin(keep) & (pd.to_datetime(actions["Date"]) >= start_ts)]
+    return have.reset_index(drop=True), actions.reset_index(drop=True)
+
+
+def plan_fetch(have: pd.DataFrame, tickers, start: str, target: dt.date) -> dict[str, list[str]]:
+    """
+    Group tickers by the first session they are missing, so each group can be
+    downloaded with one start date. Tickers already current through `target`
+    are left out entirely.
+    """
+    start_ts = pd.Timestamp(start)
+    first = pd.Series(start_ts, index=pd.Index(list(tickers), dtype="object"))
+    if not have.empty:
+        last = have.groupby("Ticker")["Date"].max()
+        last = last[last.index.isin(first.index)]
+        if not last.empty:
+            nxt = pd.Series(get_calendar().next_session(last.values), index=last.index.astype("object"))
+            first.loc[nxt.index] = nxt.where(nxt > start_ts, start_ts)
+    first = first[first <= pd.Timestamp(target)]
+    plan = {}
+    for t, d in first.items():
+        plan.setdefault(d.date().isoformat(), []).append(t)
+    return plan
+
+
+def actions_horizon() -> dt.date:
+    """
+    Exclusive end for downloads. yfinance split-adjusts history up to *now*, so the
+    window runs through today to see every split already folded into the bars;
+    bars after the target session are dropped again after unsplitting.
+    """
+    return dt.date.today() + dt.timedelta(days=1)
+
+
+def read_selection(path: Path) -> tuple[str | None, list[str]]:
+    """Last top-N selection: (target session it was ranked for, tickers in rank order)."""
+    if not path.exists():
+        return None, []
+    lines = path.read_text().splitlines()
+    target = None
+    if lines and lines[0].startswith("# target="):
+        target = lines[0].split("=", 1)[1].strip()
+    return target, [l.strip() for l in lines if l.strip() and not l.startswith("#")]
+
+
+def write_selection(path: Path, target: dt.date, tickers) -> None:
+    atomic_write_text(path, f"# target={target.isoformat()}\n" + "".join(f"{t}\n" for t in tickers))
 
 
 def quick_vol(tickers):
@@ -49,12 +113,16 @@ def quick_vol(tickers):
     return [t for t, _ in out]
 
 
+def _with_actions(g: pd.DataFrame) -> pd.DataFrame:
+    return g[BAR_COLS + [c for c in ACTION_SRC if c in g.columns]]
+
+
 def dl_chunk_multi(tickers, start, end):
-    """Batch download multiple tickers at once for speed."""
+    """Batch download multiple tickers at once for speed (bars + split/dividend columns)."""
     data = yf.download(" ".join(tickers), start=start, end=end, interval="1d",
-                       auto_adjust=False, progress=False, group_by="ticker")
+                       auto_adjust=False, actions=True, progress=False, group_by="ticker")
     if data.empty:
-        return pd.DataFrame(columns=["Date", "Ticker", "Open", "High", "Low", "Close", "Volume"])
+        return pd.DataFrame(columns=BAR_COLS)
     if isinstance(data.columns, pd.MultiIndex):
         frames = []
         for t in tickers:
@@ -62,11 +130,11 @@ def dl_chunk_multi(tickers, start, end):
                 continue
             g = data[t].reset_index()
             g["Ticker"] = t
-            frames.append(g[["Date", "Ticker", "Open", "High", "Low", "Close", "Volume"]])
+            frames.append(_with_actions(g))
         return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
     g = data.reset_index()
     g["Ticker"] = tickers[0]
-    return g[["Date", "Ticker", "Open", "High", "Low", "Close", "Volume"]]
+    return _with_actions(g)
 
 
 # ---------- MAIN ----------
@@ -75,12 +143,17 @@ def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--universe", default="configs/universe.yaml")
     ap.add_argument("--start", default="2015-01-01")
+    ap.add_argument("--history-days", type=int, default=0,
+                    help="fetch this many calendar days back from --end (overrides --start)")
     ap.add_argument("--end", default=str(date.today()))
     ap.add_argument("--dst", default=None)
     ap.add_argument("--batch", type=int, default=100)
     ap.add_argument("--sleep", type=float, default=0.10)
     ap.add_argument("--top", type=int, default=0, help="keep top-N by 5d avg volume")
     ap.add_argument("--multi", action="store_true", help="use multi-ticker downloads")
+    ap.add_argument("--force", action="store_true", help="refetch the full range even if data is current")
+    ap.add_argument("--adjust", choices=ADJUST_MODES, default="split",
+                    help="adjusted view written to --dst: split (default, as before), total (+dividends), none")
     args = ap.parse_args()
 
     cfg = load_cfg(args.universe)
@@ -91,64 +164,113 @@ def main():
         print("Universe empty.", file=sys.stderr)
         sys.exit(1)
 
-    if args.top and len(tickers) > args.top:
-        print(f"Prefiltering top {args.top} by 5-day avg volume …")
-        tickers = quick_vol(tickers)[:args.top]
-        print(f"Using top {len(tickers)} liquid tickers.")
-
-    end_day = last_trading_day(dt.date.fromisoformat(args.end))
+    cal = get_calendar()
+    # yfinance treats `end` as exclusive: the last bar we can get is the session before it
+    target = cal.previous_session(dt.date.fromisoformat(args.end), inclusive=False).date()
+    end_day = target + dt.timedelta(days=1)
+    if args.history_days:
+        args.start = (dt.date.fromisoformat(args.end) - dt.timedelta(days=args.history_days)).isoformat()
     out_path = Path(args.dst) if args.dst else Path(cfg.get("data_path", "data/combined.csv"))
     out_path.parent.mkdir(parents=True, exist_ok=True)
+    # raw (as-traded) bars + factor table are the store; out_path is the adjusted view
+    raw_path = Path(cfg.get("raw_path", out_path.with_name("raw.csv")))
+    actions_path = Path(cfg.get("actions_path", out_path.with_name("adjustments.csv")))
+    selection_path = Path(cfg.get("selection_path", out_path.with_name("selected_tickers.txt")))
 
+    # first run after the switch: seed the raw store from the existing adjusted file
+    src_path = raw_path if raw_path.exists() else out_path
     have = pd.DataFrame()
-    if out_path.exists():
+    if src_path.exists():
         try:
-            have = pd.read_csv(out_path, parse_dates=["Date"], low_memory=False, dtype={"Ticker": "string"})
+            have = pd.read_csv(src_path, parse_dates=["Date"], low_memory=False, dtype={"Ticker": "string"})
         except Exception as e:
-            print(f"Warning: could not read existing combined.csv: {e}", file=sys.stderr)
+            print(f"Warning: could not read existing {src_path.name}: {e}", file=sys.stderr)
             have = pd.DataFrame()
+    actions = load_actions(str(actions_path))
 
-    frames = []
-    for i in range(0, len(tickers), args.batch):
-        chunk = tickers[i:i + args.batch]
-        print(f"Batch {i // args.batch + 1}/{(len(tickers) + args.batch - 1) // args.batch} — {len(chunk)} tickers")
-
-        if args.multi:
-            dfc = dl_chunk_multi(chunk, args.start, end_day.isoformat())
-            if not dfc.empty:
-                frames.append(dfc)
-            time.sleep(args.sleep)
+    if args.top and len(tickers) > args.top:
+        sel_target, selected = read_selection(selection_path)
+        if not args.force and sel_target == target.isoformat() and selected:
+            # no session since the last ranking -> 5d volume order is unchanged; reuse it as-is,
+            # including tickers whose fetch failed last time so they are retried
+            tickers = selected[:args.top]
+            print(f"Reusing top {len(tickers)} tickers ranked for {target}.")
         else:
-            for t in chunk:
-                df = yf.download(t, start=args.start, end=end_day.isoformat(),
-                                 interval="1d", auto_adjust=False, progress=False)
-                if df.empty:
-                    time.sleep(args.sleep)
-                    continue
-                g = df.reset_index()
-                g["Ticker"] = t
-                frames.append(g[["Date", "Ticker", "Open", "High", "Low", "Close", "Volume"]])
-                time.sleep(args.sleep)
+            print(f"Prefiltering top {args.top} by 5-day avg volume …")
+            tickers = quick_vol(tickers)[:args.top]
+            write_selection(selection_path, target, tickers)
+            print(f"Using top {len(tickers)} liquid tickers.")
+
+    rows_before = len(have)
+    have, actions = trim_store(have, actions, tickers, args.start)
+    trimmed = len(have) < rows_before
+    if trimmed:
+        print(f"Trimmed {rows_before - len(have)} rows outside the universe or before {args.start}.")
+
+    plan = plan_fetch(pd.DataFrame() if args.force else have, tickers, args.start, target)
+    if not plan:
+        print(f"All {len(tickers)} tickers current through {target}; nothing to fetch.")
+        if trimmed:
+            atomic_to_csv(have, raw_path)
+            save_actions(str(actions_path), actions)
+        if raw_path.exists():
+            adjusted_view(str(raw_path), str(actions_path), args.adjust, cache_path=str(out_path))
+        return
 
-        if frames:
-            new = pd.concat(frames, ignore_index=True)
-            frames = []
-            if not have.empty:
-                combined = pd.concat([have, new], ignore_index=True)
+    horizon = max(end_day, actions_horizon()).isoformat()
+    frames = []
+    for fetch_start, group in sorted(plan.items()):
+        print(f"Fetching {len(group)} tickers from {fetch_start} through {target}")
+        for i in range(0, len(group), args.batch):
+            chunk = group[i:i + args.batch]
+            print(f"Batch {i // args.batch + 1}/{(len(group) + args.batch - 1) // args.batch} — {len(chunk)} tickers")
+
+            if args.multi:
+                dfc = dl_chunk_multi(chunk, fetch_start, horizon)
+                if not dfc.empty:
+                    frames.append(dfc)
+                time.sleep(args.sleep)
             else:
-                combined = new
-            combined = (
-                combined.sort_values(["Ticker", "Date"])
-                        .drop_duplicates(subset=["Ticker", "Date"], keep="last")
-            )
-            combined.to_csv(out_path, index=False)
-            have = combined
-            print(f"Saved -> {out_path} rows={len(combined)}")
-
-    if not out_path.exists() or out_path.stat().st_size == 0:
+                for t in chunk:
+                    df = yf.download(t, start=fetch_start, end=horizon,
+                                     interval="1d", auto_adjust=False, actions=True, progress=False)
+                    if df.empty:
+                        time.sleep(args.sleep)
+                        continue
+                    g = df.reset_index()
+                    g["Ticker"] = t
+                    frames.append(_with_actions(g))
+                    time.sleep(args.sleep)
+
+            if frames:
+                new = pd.concat(frames, ignore_index=True)
+                frames = []
+                acts = extract_actions(new)
+                new = unsplit(new, acts)[BAR_COLS]
+                new = new[pd.to_datetime(new["Date"]) < pd.Timestamp(end_day)]
+                actions = merge_actions(actions, acts)
+                if not have.empty:
+                    combined = pd.concat([have, new], ignore_index=True)
+                else:
+                    combined = new
+                combined = (
+                    combined.sort_values(["Ticker", "Date"])
+                            .drop_duplicates(subset=["Ticker", "Date"], keep="last")
+                )
+                atomic_to_csv(combined, raw_path)
+                have = combined
+                print(f"Saved -> {raw_path} rows={len(combined)}")
+
+    if not raw_path.exists() or raw_path.stat().st_size == 0:
         print("No data downloaded.", file=sys.stderr)
         sys.exit(1)
 
+    # new actions only add factor rows; history already on disk is never refetched
+    actions = compute_factors(actions, have)
+    save_actions(str(actions_path), actions)
+    adjusted_view(str(raw_path), str(actions_path), args.adjust, cache_path=str(out_path))
+    print(f"Adjusted ({args.adjust}) view -> {out_path}; {len(actions)} corporate actions")
+
     print(f"Done. Final rows={len(have)} -> {out_path}")
 
 
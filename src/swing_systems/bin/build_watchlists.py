@@ -3,16 +3,21 @@ from pathlib import Path
 import pandas as pd
 import numpy as np
 import yaml
+from ..common.io import STREAM_ROWS, iter_ticker_frames, max_date
+from ..common.membership import MembershipHistory, DEFAULT_PATH as HISTORY_PATH
+from ..common.trading_calendar import stale_tickers
 
 # ---------- helpers ----------
 
 def atr(df: pd.DataFrame, n: int = 14) -> pd.Series:
+    """Simple-average ATR; computed per Ticker when the frame holds several."""
     h = pd.to_numeric(df["High"], errors="coerce")
     l = pd.to_numeric(df["Low"], errors="coerce")
     c = pd.to_numeric(df["Close"], errors="coerce")
-    prev_c = c.shift(1)
+    by = df["Ticker"] if "Ticker" in df.columns else pd.Series(0, index=df.index)
+    prev_c = c.groupby(by).shift(1)
     tr = pd.concat([(h - l), (h - prev_c).abs(), (l - prev_c).abs()], axis=1).max(axis=1)
-    return tr.rolling(n, min_periods=n).mean()
+    return tr.groupby(by).transform(lambda s: s.rolling(n, min_periods=n).mean())
 
 def sma(s: pd.Series, n: int) -> pd.Series:
     s = pd.to_numeric(s, errors="coerce")
@@ -22,6 +27,34 @@ def last_snapshot(df: pd.DataFrame) -> pd.DataFrame:
     ix = df.groupby("Ticker")["Date"].idxmax()
     return df.loc[ix].reset_index(drop=True)
 
+def clean(df: pd.DataFrame) -> pd.DataFrame:
+    for col in ["Open","High","Low","Close","Volume"]:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    df = df.dropna(subset=["Date","Open","High","Low","Close"])
+    return df.sort_values(["Ticker","Date"])
+
+def add_features(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df["ATR14"] = atr(df, 14)
+    df["MA50"]  = df.groupby("Ticker")["Close"].transform(lambda s: sma(s, 50))
+    df["MA200"] = df.groupby("Ticker")["Close"].transform(lambda s: sma(s, 200))
+    df["Vol30"] = df.groupby("Ticker")["Volume"].transform(lambda s: s.rolling(30, min_periods=10).mean())
+    df["ATRp"]  = (df["ATR14"] / df["Close"]) * 100.0
+    return df
+
+def stream_snapshots(path: str, cutoff: pd.Timestamp, tickers_per_frame: int,
+                     chunksize: int = STREAM_ROWS) -> pd.DataFrame:
+    """Features + last-bar snapshot per ticker chunk; only snapshot rows are kept."""
+    snaps = []
+    for frame in iter_ticker_frames(path, tickers_per_frame=tickers_per_frame, since=cutoff,
+                                    chunksize=chunksize):
+        frame = clean(frame)
+        if not frame.empty:
+            snaps.append(last_snapshot(add_features(frame)))
+        del frame
+    return pd.concat(snaps, ignore_index=True) if snaps else pd.DataFrame()
+
 def write_yaml(path: Path, tickers: list[str]):
     path.parent.mkdir(parents=True, exist_ok=True)
     with open(path, "w") as f:
@@ -34,28 +67,32 @@ def main():
     ap.add_argument("--combined", default="data/combined.csv")
     ap.add_argument("--outdir", default="configs/watchlists")
     ap.add_argument("--lookback", type=int, default=90)
+    ap.add_argument("--stream", action="store_true",
+                    help="read per ticker chunk; peak memory independent of universe size")
+    ap.add_argument("--chunk-tickers", type=int, default=250)
+    ap.add_argument("--history", default=HISTORY_PATH, help="membership bitmap history ('' to disable)")
     args = ap.parse_args()
 
-    df = pd.read_csv(args.combined, parse_dates=["Date"], low_memory=False, dtype={"Ticker": "string"})
-    # enforce numerics up-front
-    for col in ["Open","High","Low","Close","Volume"]:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-    df = df.dropna(subset=["Date","Open","High","Low","Close"])
-    df = df.sort_values(["Ticker","Date"])
-
-    # limit window (buffer for indicators)
-    cutoff = df["Date"].max() - pd.Timedelta(days=args.lookback*2)
-    df = df[df["Date"] >= cutoff].copy()
-
-    # indicators
-    df["ATR14"] = df.groupby("Ticker", group_keys=False).apply(lambda g: atr(g, 14)).reset_index(drop=True)
-    df["MA50"]  = df.groupby("Ticker")["Close"].transform(lambda s: sma(s, 50))
-    df["MA200"] = df.groupby("Ticker")["Close"].transform(lambda s: sma(s, 200))
-    df["Vol30"] = df.groupby("Ticker")["Volume"].transform(lambda s: s.rolling(30, min_periods=10).mean())
-    df["ATRp"]  = (df["ATR14"] / df["Close"]) * 100.0
-
-    snap = last_snapshot(df)
+    if args.stream:
+        asof = max_date(args.combined)
+        cutoff = asof - pd.Timedelta(days=args.lookback*2)
+        snap = stream_snapshots(args.combined, cutoff, args.chunk_tickers)
+    else:
+        df = pd.read_csv(args.combined, parse_dates=["Date"], low_memory=False, dtype={"Ticker": "string"})
+        # enforce numerics up-front
+        df = clean(df)
+
+        # limit window (buffer for indicators)
+        asof = df["Date"].max()
+        cutoff = asof - pd.Timedelta(days=args.lookback*2)
+        df = df[df["Date"] >= cutoff].copy()
+
+        snap = last_snapshot(add_features(df))
+    # the bar store is persisted, so tickers that left the fetched universe keep old bars
+    stale = stale_tickers(snap, asof)
+    if len(stale):
+        print(f"Excluding {len(stale)} stale tickers (last bar before {asof.date()}).")
+        snap = snap[~snap["Ticker"].isin(stale.index)]
     snap = snap.replace([np.inf, -np.inf], np.nan).dropna(subset=["Close","Vol30","ATR14","MA50","MA200","ATRp"])
 
     # base liquidity filter
@@ -75,5 +112,13 @@ def main():
 
     print(f"Watchlists written to {outdir}")
 
+    if args.history:
+        hist = MembershipHistory(args.history)
+        for strat, tickers in (("rsi2_us", rsi2_us), ("rsi2_5_70_sso", rsi2_570),
+                               ("double_seven", dbl7), ("connors_3d_hl", c3dhl)):
+            hist.record(strat, asof, tickers)
+        hist.save()
+        print(f"Membership for {asof.date()} recorded in {args.history}")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
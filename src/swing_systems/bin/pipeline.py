@@ -0,0 +1,135 @@
+import argparse
+import datetime as dt
+import shutil
+import sys
+import zipfile
+from pathlib import Path
+import pandas as pd
+import yaml
+from ..common.pipeline import Stage, run_pipeline
+from ..common.trading_calendar import get_calendar, stale_tickers
+from .build_data import read_selection
+from .run_all import STRATEGIES
+
+PKG = Path(__file__).resolve().parent.parent
+STATE = "state/pipeline.json"
+
+def _src(*rel: str) -> list[str]:
+    return [str(PKG / r) for r in rel]
+
+def package_results(data_path: str, wl_dir: str, docs: str = "docs") -> None:
+    """Zip outputs/state/data/watchlists into docs/ (same layout the workflow published)."""
+    docs_dir = Path(docs)
+    docs_dir.mkdir(parents=True, exist_ok=True)
+    (docs_dir / ".nojekyll").write_text("\n")
+    (docs_dir / "index.html").write_text("<meta http-equiv='refresh' content='0; url=swing-results-latest.zip'>\n")
+    name = docs_dir / f"swing-results-{dt.datetime.now(dt.timezone.utc):%Y%m%d}.zip"
+    with zipfile.ZipFile(name, "w", zipfile.ZIP_DEFLATED) as z:
+        for root in ("outputs", "state", wl_dir):
+            for p in sorted(Path(root).rglob("*")):
+                if p.is_file() and not p.name.endswith(".lock"):
+                    z.write(p)
+        if Path(data_path).exists():
+            z.write(data_path)
+    shutil.copyfile(name, docs_dir / "swing-results-latest.zip")
+    print(f"Packaged -> {name}")
+
+def store_current(data_path: str, selection_path: str, target: dt.date) -> bool:
+    """
+    True when every ticker build_data was asked for has a bar for `target`.
+    build_data exits 0 on a short fetch (Yahoo late with the session), and
+    a fingerprint recorded then would make same-day reruns skip the refetch.
+    """
+    if not Path(data_path).exists():
+        return False
+    bars = pd.read_csv(data_path, usecols=["Ticker", "Date"], parse_dates=["Date"], dtype={"Ticker": "string"})
+    sel_target, selected = read_selection(Path(selection_path))
+    wanted = set(selected) if sel_target == target.isoformat() else set(bars["Ticker"].dropna())
+    missing = wanted - set(bars["Ticker"].dropna())
+    behind = stale_tickers(bars[bars["Ticker"].isin(wanted)], pd.Timestamp(target))
+    if missing or len(behind):
+        print(f"build_data: {len(missing) + len(behind)} of {len(wanted)} tickers have no bar for {target}")
+    return not missing and not len(behind)
+
+def build_stages(args) -> list[Stage]:
+    with open(args.universe, "r") as f:
+        uni = yaml.safe_load(f) or {}
+    data_path = uni.get("data_path", "data/combined.csv")
+    selection_path = uni.get("selection_path", str(Path(data_path).with_name("selected_tickers.txt")))
+    wl = args.watchlist_dir
+    py = [sys.executable, "-m"]
+    # the last bar build_data can fetch today; a new session is what makes data stale
+    target = get_calendar().previous_session(dt.date.today(), inclusive=False).date()
+
+    # pass the window, not a start date: a dated argv would change the fingerprint every day
+    data_cmd = py + ["swing_systems.bin.build_data", "--universe", args.universe,
+                     "--history-days", str(args.history_days),
+                     "--batch", str(args.batch), "--sleep", str(args.sleep), "--top", str(args.top)]
+    if args.multi:
+        data_cmd.append("--multi")
+
+    stages = [
+        Stage("build_data", data_cmd,
+              inputs=[args.universe, *_src("bin/build_data.py", "common/adjustments.py",
+                                           "common/io.py", "common/trading_calendar.py")],
+              outputs=[data_path],
+              params={"target": target, "top": args.top, "history_days": args.history_days},
+              complete=lambda: store_current(data_path, selection_path, target)),
+        Stage("build_watchlists",
+              py + ["swing_systems.bin.build_watchlists", "--combined", data_path,
+                    "--outdir", wl, "--lookback", str(args.lookback)],
+              deps=["build_data"],
+              inputs=[data_path, *_src("bin/build_watchlists.py", "common/io.py",
+                                             "common/membership.py", "common/trading_calendar.py")],
+              outputs=[f"{wl}/{s}.yaml" for s in STRATEGIES]),
+    ]
+    for s in STRATEGIES:
+        ledger = f"state/{s}_state.csv"
+        stages.append(Stage(
+            f"scan:{s}",
+            py + [f"swing_systems.bin.run_{s}", "--universe", args.universe,
+                  "--include-file", f"{wl}/{s}.yaml"],
+            deps=["build_watchlists"],
+            # the ledger is re-hashed after each run, so only outside edits force a rerun
+            inputs=[data_path, f"{wl}/{s}.yaml", ledger,
+                    *_src(f"strategies/{s}.py", f"bin/run_{s}.py", "common/engine.py",
+                          "common/indicators.py", "common/io.py", "common/trading_calendar.py")],
+            outputs=[ledger],
+        ))
+    stages.append(Stage(
+        "package",
+        lambda: package_results(data_path, wl),
+        deps=[f"scan:{s}" for s in STRATEGIES],
+        inputs=["outputs/**/*.csv", "state/*_state.csv", data_path, f"{wl}/*.yaml"],
+        outputs=["docs/swing-results-latest.zip"],
+        params={"data_path": data_path, "watchlist_dir": wl},
+    ))
+    return stages
+
+def main():
+    ap = argparse.ArgumentParser(description="build_data -> build_watchlists -> scanners -> package, "
+                                             "skipping stages whose inputs are unchanged")
+    ap.add_argument("--universe", default="configs/universe.yaml")
+    ap.add_argument("--watchlist-dir", default="configs/watchlists")
+    ap.add_argument("--history-days", type=int, default=300)
+    ap.add_argument("--batch", type=int, default=200)
+    ap.add_argument("--sleep", type=float, default=0.05)
+    ap.add_argument("--top", type=int, default=150)
+    ap.add_argument("--multi", action="store_true")
+    ap.add_argument("--lookback", type=int, default=120)
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--state", default=STATE, help="where stage fingerprints are kept")
+    ap.add_argument("--force", action="store_true", help="run every stage regardless of fingerprints")
+    ap.add_argument("--dry-run", action="store_true", help="report what would run")
+    args = ap.parse_args()
+
+    status = run_pipeline(build_stages(args), args.state, workers=args.workers,
+                          force=args.force, dry_run=args.dry_run)
+    ran = sum(v == "ran" for v in status.values())
+    skipped = sum(v == "skipped" for v in status.values())
+    print(f"Pipeline: {ran} ran, {skipped} skipped, {len(status) - ran - skipped} failed/blocked")
+    if any(v in ("failed", "blocked") for v in status.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+import pandas as pd
+from ..common.engine import load_state
+from ..common.io import atomic_to_csv
+from ..common.robustness import MODES, bands, trade_returns
+
+def main():
+    ap = argparse.ArgumentParser(description="Bootstrap / shuffle / slippage bands for a strategy's closed trades")
+    ap.add_argument("--strategy", required=True, help="reads state/<strategy>_state.csv")
+    ap.add_argument("--state", default=None, help="explicit ledger path (overrides --strategy lookup)")
+    ap.add_argument("--sims", type=int, default=50_000)
+    ap.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    ap.add_argument("--fraction", type=float, default=0.1, help="equity fraction committed per trade")
+    ap.add_argument("--slippage-bps", type=float, default=5.0, help="mean slippage per side, bps")
+    ap.add_argument("--workers", type=int, default=0, help="0 = all cores")
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--out", default=None, help="CSV path (default outputs/<strategy>/robustness.csv)")
+    args = ap.parse_args()
+
+    state_path = args.state or str(Path("state") / f"{args.strategy}_state.csv")
+    r, period, years = trade_returns(load_state(state_path))
+    if len(r) < 2:
+        print(f"{state_path}: {len(r)} closed trades; need at least 2.", file=sys.stderr)
+        sys.exit(1)
+
+    t0 = time.perf_counter()
+    res = bands(r, period, years, args.sims, args.modes, args.fraction, args.slippage_bps,
+                workers=args.workers or None, seed=args.seed)
+    secs = time.perf_counter() - t0
+
+    out = Path(args.out) if args.out else Path("outputs") / args.strategy / "robustness.csv"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    atomic_to_csv(res, out)
+    with pd.option_context("display.float_format", "{:.4f}".format, "display.width", 120):
+        print(res.to_string(index=False))
+    print(f"{len(r)} trades on {period.max() + 1} exit days over {years:.2f}y, {args.sims} sims x {len(args.modes)} modes in {secs:.1f}s -> {out}")
+
+if __name__ == "__main__":
+    main()
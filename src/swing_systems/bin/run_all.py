@@ -0,0 +1,48 @@
+import argparse
+import importlib
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+STRATEGIES = ["double_seven", "rsi2_us", "rsi2_5_70_sso", "connors_3d_hl"]
+
+def _run_one(strat: str, universe: str, include_file: str) -> tuple[str, int, int, float]:
+    """Worker: import the strategy's runner and execute it. Returns small counts only."""
+    t0 = time.perf_counter()
+    mod = importlib.import_module(f"swing_systems.bin.run_{strat}")
+    entries, exits, _ = mod.run(universe, include_file)
+    return strat, len(entries), len(exits), time.perf_counter() - t0
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--universe", required=True)
+    ap.add_argument("--watchlist-dir", default="configs/watchlists",
+                    help="per-strategy include files are read from <dir>/<strategy>.yaml")
+    ap.add_argument("--strategies", nargs="+", default=STRATEGIES, choices=STRATEGIES)
+    ap.add_argument("--workers", type=int, default=0, help="0 = one process per strategy")
+    args = ap.parse_args()
+
+    wl_dir = Path(args.watchlist_dir)
+    jobs = {s: str(wl_dir / f"{s}.yaml") for s in args.strategies}
+
+    workers = args.workers or len(jobs)
+    failed = []
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futs = {pool.submit(_run_one, s, args.universe, inc): s for s, inc in jobs.items()}
+        for fut in as_completed(futs):
+            s = futs[fut]
+            try:
+                _, n_e, n_x, secs = fut.result()
+                print(f"[{s}] entries={n_e} exits={n_x} ({secs:.1f}s)")
+            except Exception as e:
+                failed.append(s)
+                print(f"[{s}] FAILED: {e!r}", file=sys.stderr)
+
+    print(f"Scanned {len(jobs) - len(failed)}/{len(jobs)} strategies in {time.perf_counter() - t0:.1f}s")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import argparse, pandas as pd, yaml
 from pathlib import Path
 from ..common.engine import Ctx, run_strategy
+from ..common.io import read_bars
 from ..strategies.rsi2_us import signals as st_signals
 
 DEF_DATA = "data/combined.csv"
@@ -10,30 +11,33 @@ def load_df(universe_yaml: str, include_file: str | None) -> pd.DataFrame:
     with open(universe_yaml, "r") as f:
         uni = yaml.safe_load(f) or {}
     data_path = Path(uni.get("data_path", DEF_DATA))
-    df = pd.read_csv(data_path, parse_dates=["Date"], low_memory=False)
+    incl = None
     if include_file:
         with open(include_file, "r") as f:
             inc = yaml.safe_load(f) or {}
-        incl = set(inc.get("universe", []))
-        if incl:
-            df = df[df["Ticker"].isin(incl)]
+        incl = set(inc.get("universe", [])) or None
+    # filtered chunk by chunk: only watchlist rows are ever held in memory
+    df = read_bars(data_path, include=incl)
     return df
 
+def run(universe: str, include_file: str | None = None):
+    df = load_df(universe, include_file)
+    ctx = Ctx(df)
+    out_dir = Path("outputs") / STRAT
+    state_path = Path("state") / f"{STRAT}_state.csv"
+
+    def adapter(context, state, frame):
+        return st_signals(context, state, frame)  # returns (entries, exits, dft)
+
+    return run_strategy(ctx, state_path, out_dir, adapter)
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--universe", required=True)
     ap.add_argument("--include-file", default=None)
     args = ap.parse_args()
 
-    df = load_df(args.universe, args.include_file)
-    ctx = Ctx(df)
-    out_dir = Path("outputs") / STRAT
-    state_path = Path("state") / f"{STRAT}_state.csv"
-
-    def adapter(context, state, _unused):
-        return st_signals(context, state, df)  # returns (entries, exits, dft)
-
-    run_strategy(ctx, state_path, out_dir, adapter)
+    run(args.universe, args.include_file)
 
 if __name__ == "__main__":
     main()
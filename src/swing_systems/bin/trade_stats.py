@@ -0,0 +1,49 @@
+import argparse
+import os
+from pathlib import Path
+import pandas as pd
+import yaml
+from ..common.adjustments import load_actions
+from ..common.engine import load_state
+from ..common.io import atomic_to_csv, read_bars
+from ..common.trade_analytics import BarIndex, excursions, rebase, summarize
+from .run_all import STRATEGIES
+
+def main():
+    ap = argparse.ArgumentParser(description="Per-trade MAE/MFE, holding period and return for each ledger")
+    ap.add_argument("--universe", default="configs/universe.yaml")
+    ap.add_argument("--strategies", nargs="+", default=STRATEGIES, choices=STRATEGIES)
+    ap.add_argument("--out", default="outputs/trade_stats.csv", help="per-strategy summary CSV")
+    args = ap.parse_args()
+
+    with open(args.universe, "r") as f:
+        uni = yaml.safe_load(f) or {}
+    data_path = uni.get("data_path", "data/combined.csv")
+    # ledger prices are as traded while data_path is re-adjusted on every new action:
+    # re-base the ledgers onto the view's basis with the factor table build_data keeps
+    actions = load_actions(uni.get("actions_path", str(Path(data_path).with_name("adjustments.csv"))))
+    mode_path = f"{data_path}.mode"
+    how = open(mode_path).read().strip() if os.path.exists(mode_path) else "split"
+
+    ledgers = {s: load_state(str(Path("state") / f"{s}_state.csv")) for s in args.strategies}
+    traded = set().union(*(set(l["Ticker"].dropna().astype(str)) for l in ledgers.values()))
+    # only tickers that appear in some ledger are indexed; no trades -> no bars to read
+    bars = read_bars(data_path, include=traded) if traded else pd.DataFrame(
+        columns=["Ticker", "Date", "Low", "High", "Close"])
+    index = BarIndex(bars)
+
+    rows = []
+    for s, ledger in ledgers.items():
+        ex = excursions(rebase(ledger, actions, how), index)
+        if not ex.empty:
+            atomic_to_csv(ex, Path("outputs") / s / "trades_mae_mfe.csv")
+        rows.append(summarize(ex, s))
+
+    summary = pd.DataFrame(rows)
+    atomic_to_csv(summary, args.out)
+    with pd.option_context("display.float_format", "{:.4f}".format, "display.width", 160):
+        print(summary.to_string(index=False))
+    print(f"Summary -> {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Raw bars + corporate-action factor table.
+
+The bar store keeps prices as traded (no split/dividend adjustment) and a small
+per-ticker table of actions. Adjusted prices are derived at read time:
+
+    adjusted = raw * product(factor for every action with ex-date after the bar)
+
+so a new split or dividend only appends one row to the factor table instead of
+forcing a full history refetch.
+"""
+import os
+import numpy as np
+import pandas as pd
+from .io import atomic_to_csv, atomic_write_text
+
+ACTION_COLS = ["Ticker", "Date", "Split", "Dividend", "SplitFactor", "DivFactor"]
+PRICE_COLS = ["Open", "High", "Low", "Close"]
+ADJUST_MODES = ("none", "split", "total")
+
+def empty_actions() -> pd.DataFrame:
+    return pd.DataFrame({c: pd.Series(dtype="float64") for c in ACTION_COLS}).astype(
+        {"Ticker": "string", "Date": "datetime64[ns]"})
+
+def load_actions(path: str) -> pd.DataFrame:
+    if not os.path.exists(path):
+        return empty_actions()
+    a = pd.read_csv(path, parse_dates=["Date"], dtype={"Ticker": "string"})
+    for c in ACTION_COLS:
+        if c not in a.columns:
+            a[c] = np.nan
+    return a[ACTION_COLS]
+
+def save_actions(path: str, actions: pd.DataFrame) -> None:
+    atomic_to_csv(actions[ACTION_COLS].sort_values(["Ticker", "Date"]), path)
+
+def extract_actions(dl: pd.DataFrame) -> pd.DataFrame:
+    """Pull split/dividend events out of a yfinance download (actions=True)."""
+    if dl is None or dl.empty:
+        return empty_actions()
+    none = pd.Series(0.0, index=dl.index)
+    split = pd.to_numeric(dl.get("Stock Splits", none), errors="coerce").fillna(0.0)
+    div = pd.to_numeric(dl.get("Dividends", none), errors="coerce").fillna(0.0)
+    ev = dl.loc[(split != 0) | (div != 0), ["Ticker", "Date"]].copy()
+    ev["Split"] = split[ev.index].replace(0.0, 1.0)
+    ev["Dividend"] = div[ev.index]
+    ev["SplitFactor"] = np.nan
+    ev["DivFactor"] = np.nan
+    return ev[ACTION_COLS].reset_index(drop=True)
+
+def unsplit(dl: pd.DataFrame, actions: pd.DataFrame) -> pd.DataFrame:
+    """
+    Undo the split adjustment yfinance applies even with auto_adjust=False, using
+    splits inside the downloaded window. Returns bars as traded.
+    """
+    out = dl.copy()
+    splits = actions[actions["Split"].fillna(1.0) != 1.0]
+    if out.empty or splits.empty:
+        return out
+    ratio = _cum_after(out, splits.assign(F=splits["Split"]), "F")
+    for c in PRICE_COLS:
+        out[c] = pd.to_numeric(out[c], errors="coerce") * ratio
+    out["Volume"] = pd.to_numeric(out["Volume"], errors="coerce") / ratio
+    return out
+
+def merge_actions(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    both = pd.concat([old, new], ignore_index=True)
+    both = both.dropna(subset=["Ticker", "Date"])
+    return both.drop_duplicates(subset=["Ticker", "Date"], keep="first").reset_index(drop=True)
+
+def compute_factors(actions: pd.DataFrame, raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    Fill SplitFactor (1/ratio) and DivFactor (1 - div / prior raw close) for rows
+    that lack them. Existing factors are never recomputed, so history is stable.
+    """
+    a = actions.copy()
+    a["SplitFactor"] = a["SplitFactor"].fillna(1.0 / a["Split"].fillna(1.0))
+    need = a["DivFactor"].isna()
+    if need.any():
+        prev = _prior_close(a.loc[need, ["Ticker", "Date"]], raw)
+        div = a.loc[need, "Dividend"].fillna(0.0)
+        f = (1.0 - div / prev).where(prev > 0)
+        # a dividend with no prior bar to anchor it stays NaN and is retried next build
+        a.loc[need, "DivFactor"] = f.where(div != 0, 1.0)
+    return a
+
+def action_basis(actions: pd.DataFrame, tickers, how: str = "split") -> pd.Series:
+    """
+    Per-ticker token naming the basis adjusted prices are on: the mode plus the
+    ticker's action count and latest ex-date. It changes exactly when a ticker's
+    adjusted history is rewritten, so derived caches can invalidate per ticker.
+    """
+    tickers = pd.Index(pd.unique(pd.Series(list(tickers), dtype="string").dropna()))
+    a = actions.dropna(subset=["Ticker", "Date"])
+    by = a.groupby(a["Ticker"].astype("string"))["Date"]
+    last = pd.to_datetime(by.max()).dt.strftime("%Y-%m-%d").reindex(tickers).fillna("-")
+    count = by.size().reindex(tickers).fillna(0).astype(int).astype(str)
+    return (how + ":" + count + "@" + last).rename("Basis")
+
+def _asof_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """merge_asof needs identical key dtypes: yfinance frames carry str/object, CSV reads 'string'."""
+    df["Ticker"] = df["Ticker"].astype("string")
+    df["Date"] = pd.to_datetime(df["Date"]).astype("datetime64[ns]")
+    return df
+
+def _prior_close(keys: pd.DataFrame, raw: pd.DataFrame) -> pd.Series:
+    k = _asof_keys(keys.assign(_i=np.arange(len(keys)))).sort_values("Date")
+    r = _asof_keys(raw[["Ticker", "Date", "Close"]].dropna().copy()).sort_values("Date")
+    m = pd.merge_asof(k, r, on="Date", by="Ticker", direction="backward", allow_exact_matches=False)
+    return pd.Series(m.sort_values("_i")["Close"].to_numpy(), index=keys.index)
+
+def _cum_after(bars: pd.DataFrame, actions: pd.DataFrame, col: str) -> np.ndarray:
+    """
+    For every bar, product of actions[col] over actions strictly after the bar's
+    Date (same ticker). Suffix products + one merge_asof, vectorized across tickers.
+    """
+    a = actions[["Ticker", "Date", col]].dropna(subset=["Date"]).copy()
+    a[col] = a[col].fillna(1.0)
+    a = a.sort_values(["Ticker", "Date"])
+    a["_suffix"] = a.iloc[::-1].groupby("Ticker")[col].cumprod().iloc[::-1]
+    b = _asof_keys(bars[["Ticker", "Date"]].assign(_i=np.arange(len(bars))))
+    a = _asof_keys(a[["Ticker", "Date", "_suffix"]].copy())
+    m = pd.merge_asof(b.sort_values("Date"), a.sort_values("Date"),
+                      on="Date", by="Ticker", direction="forward", allow_exact_matches=False)
+    return m.sort_values("_i")["_suffix"].fillna(1.0).to_numpy()
+
+def price_factors(keys: pd.DataFrame, actions: pd.DataFrame, how: str = "split") -> np.ndarray:
+    """
+    Multiplier taking an as-traded price on (Ticker, Date) to the `how` adjusted
+    basis: the product of price factors for that ticker's later actions.
+    Rows with no Date get 1.0.
+    """
+    if how not in ADJUST_MODES:
+        raise ValueError(f"adjust mode must be one of {ADJUST_MODES}, got {how!r}")
+    out = np.ones(len(keys))
+    dated = pd.to_datetime(keys["Date"], errors="coerce").notna().to_numpy()
+    if how == "none" or actions.empty or not dated.any():
+        return out
+    a = actions.copy()
+    a["_price"] = a["SplitFactor"].fillna(1.0) * (a["DivFactor"].fillna(1.0) if how == "total" else 1.0)
+    out[dated] = _cum_after(keys.loc[dated, ["Ticker", "Date"]], a, "_price")
+    return out
+
+def adjust(raw: pd.DataFrame, actions: pd.DataFrame, how: str = "split") -> pd.DataFrame:
+    """Adjusted copy of raw bars: 'split' (like yfinance auto_adjust=False) or 'total'."""
+    if how not in ADJUST_MODES:
+        raise ValueError(f"adjust mode must be one of {ADJUST_MODES}, got {how!r}")
+    out = raw.copy()
+    if how == "none" or out.empty or actions.empty:
+        return out
+    a = actions.copy()
+    a["_split"] = a["SplitFactor"].fillna(1.0)
+    price = price_factors(out, actions, how)
+    split = _cum_after(out, a, "_split")
+    for c in PRICE_COLS:
+        if c in out.columns:
+            out[c] = pd.to_numeric(out[c], errors="coerce") * price
+    if "Volume" in out.columns:
+        out["Volume"] = pd.to_numeric(out["Volume"], errors="coerce") / split
+    return out
+
+def adjusted_view(raw_path: str, actions_path: str, how: str = "split",
+                  cache_path: str | None = None) -> pd.DataFrame:
+    """
+    Adjusted bars, served from `cache_path` while it is newer than both the raw
+    store and the factor table and was built with the same `how`; rebuilt (and
+    re-cached) otherwise. The mode is kept in a `<cache_path>.mode` sidecar.
+    """
+    mode_path = f"{cache_path}.mode" if cache_path else None
+    src_mtime = max(os.path.getmtime(p) for p in (raw_path, actions_path) if os.path.exists(p))
+    if (cache_path and os.path.exists(cache_path) and os.path.getmtime(cache_path) >= src_mtime
+            and os.path.exists(mode_path) and open(mode_path).read().strip() == how):
+        return pd.read_csv(cache_path, parse_dates=["Date"], low_memory=False, dtype={"Ticker": "string"})
+    raw = pd.read_csv(raw_path, parse_dates=["Date"], low_memory=False, dtype={"Ticker": "string"})
+    out = adjust(raw, load_actions(actions_path), how)
+    if cache_path:
+        atomic_to_csv(out, cache_path)
+        atomic_write_text(mode_path, how + "\n")
+    return out
@@ -2,18 +2,36 @@
 import os
 import pandas as pd
 from datetime import datetime, timezone
+from .io import atomic_to_csv, file_lock
+from .trading_calendar import get_calendar, stale_tickers
 
 REQUIRED_COLS = ["Ticker","EntryDate","EntryPrice","Status","ExitDate","ExitPrice","Notes"]
 
 def _naive_today_from(df: pd.DataFrame) -> pd.Timestamp:
     if isinstance(df, pd.DataFrame) and "Date" in df.columns and not df["Date"].isna().all():
-        return pd.to_datetime(df["Date"].max()).normalize()
+        # snap to a real session so stray weekend/holiday rows don't define "today"
+        return get_calendar().previous_session(pd.to_datetime(df["Date"].max()).normalize())
     return pd.Timestamp(datetime.now(timezone.utc).date())
 
+def expected_session(now=None) -> pd.Timestamp:
+    """Latest session a fetch run at `now` can have (build_data's end date is exclusive)."""
+    now = pd.Timestamp(now) if now is not None else pd.Timestamp(datetime.now(timezone.utc).date())
+    return get_calendar().previous_session(now.normalize(), inclusive=False)
+
 class Ctx:
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, drop_stale: bool = True, now=None):
         self.df = df.copy() if isinstance(df, pd.DataFrame) else pd.DataFrame()
         self.today = _naive_today_from(self.df)
+        # staleness is judged against the calendar too, so a frame where *every*
+        # ticker is behind (e.g. a failed build_data) is caught, not taken as "today"
+        self.expected = expected_session(now)
+        ref = max(self.today, self.expected)
+        # tickers whose latest bar is older than the reference session: sessions behind
+        self.stale = stale_tickers(self.df, ref) if not self.df.empty else pd.Series(dtype="int64")
+        if drop_stale and not self.stale.empty:
+            print(f"Skipping {len(self.stale)} stale tickers (missing bar for {ref.date()}): "
+                  f"{', '.join(map(str, self.stale.index[:20]))}{' …' if len(self.stale) > 20 else ''}")
+            self.df = self.df[~self.df["Ticker"].isin(self.stale.index)]
 
 def _ensure_state_columns(state: pd.DataFrame) -> pd.DataFrame:
     if state is None or (isinstance(state, pd.DataFrame) and state.empty):
@@ -51,7 +69,7 @@ def load_state(path: str) -> pd.DataFrame:
 
 def save_state(path: str, state: pd.DataFrame) -> None:
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    _ensure_state_columns(state).to_csv(path, index=False)
+    atomic_to_csv(_ensure_state_columns(state), path)
 
 def _as_df(obj, cols=("Ticker","Date","Close")) -> pd.DataFrame:
     """Coerce entries/exits to DataFrame with at least Ticker/Date/Close."""
@@ -99,6 +117,16 @@ def _normalize_entries_exits(entries, exits):
     return e, x
 
 def run_strategy(ctx: Ctx, state_path: str, out_dir: str, signal_fn):
+    # one writer per ledger: concurrent runs of the same strategy serialize here
+    with file_lock(f"{state_path}.lock"):
+        return _run_strategy_locked(ctx, state_path, out_dir, signal_fn)
+
+def _run_strategy_locked(ctx: Ctx, state_path: str, out_dir: str, signal_fn):
+    if ctx.df.empty and not ctx.stale.empty:
+        # nothing current to evaluate: leave ledger and outputs as they are
+        print(f"All {len(ctx.stale)} tickers are stale (expected bars for {ctx.expected.date()}); skipping.")
+        empty = pd.DataFrame(columns=["Ticker","Date","Close"])
+        return empty, empty, None
     os.makedirs(out_dir, exist_ok=True)
     state = load_state(state_path)
 
@@ -121,8 +149,8 @@ def run_strategy(ctx: Ctx, state_path: str, out_dir: str, signal_fn):
     e_path = os.path.join(out_dir, f"entries_{today_str}.csv")
     x_path = os.path.join(out_dir, f"exits_{today_str}.csv")
 
-    (entries if not entries.empty else pd.DataFrame(columns=["Ticker","Date","Close"])).to_csv(e_path, index=False)
-    (exits   if not exits.empty   else pd.DataFrame(columns=["Ticker","Date","Close"])).to_csv(x_path, index=False)
+    atomic_to_csv(entries if not entries.empty else pd.DataFrame(columns=["Ticker","Date","Close"]), e_path)
+    atomic_to_csv(exits   if not exits.empty   else pd.DataFrame(columns=["Ticker","Date","Close"]), x_path)
 
     # Update portfolio state
     s = state.copy()
@@ -162,7 +190,7 @@ def run_strategy(ctx: Ctx, state_path: str, out_dir: str, signal_fn):
 
     open_df = s.loc[s["Status"] == "open", ["Ticker","EntryDate","EntryPrice","Status"]].copy()
     open_path = os.path.join(out_dir, f"open_positions_{today_str}.csv")
-    open_df.to_csv(open_path, index=False)
+    atomic_to_csv(open_df, open_path)
 
     print(f"Today: {today_str}")
     print(f"Entries: {len(entries)} -> {e_path}")
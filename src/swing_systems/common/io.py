@@ -1,5 +1,137 @@
-import yaml
+import os
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
+import pandas as pd
+import yaml
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: locking degrades to a no-op
+    fcntl = None
+
+def _current_umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+# read once at import: os.umask can only be queried by setting it, which isn't thread-safe
+_UMASK = _current_umask()
+
 def load_config(path: str | Path) -> dict:
     with open(path, 'r') as f:
-        return yaml.safe_load(f)
\ No newline at end of file
+        return yaml.safe_load(f)
+
+@contextmanager
+def atomic_path(path: str | Path):
+    """Yield a temp path next to `path`; rename it over `path` only if the block succeeds."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    os.close(fd)
+    try:
+        yield tmp
+        # mkstemp creates 0600; give the result the mode a plain open() would have
+        os.chmod(tmp, 0o666 & ~_UMASK)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+def atomic_write_text(path: str | Path, text: str) -> None:
+    """Write text to a temp file in the same directory, then rename over path."""
+    with atomic_path(path) as tmp:
+        with open(tmp, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+
+def atomic_to_csv(df: pd.DataFrame, path: str | Path, **kwargs) -> None:
+    """DataFrame.to_csv that never leaves a torn file behind if killed mid-write."""
+    kwargs.setdefault("index", False)
+    atomic_write_text(path, df.to_csv(**kwargs))
+
+@contextmanager
+def file_lock(path: str | Path):
+    """Exclusive advisory lock on `path` (created if missing), held for the block."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+# ---------- chunked bar readers ----------
+
+STREAM_ROWS = 250_000
+
+def read_bars(path: str | Path, include=None, since=None, chunksize: int = STREAM_ROWS) -> pd.DataFrame:
+    """
+    Read combined.csv in row chunks, dropping rows outside `include` / before `since`
+    chunk by chunk so only the kept rows are ever held in memory at once.
+    `include=None` keeps every ticker; an empty `include` keeps none.
+    """
+    incl = set(include) if include is not None else None
+    since = pd.Timestamp(since) if since is not None else None
+    kept = []
+    for chunk in pd.read_csv(path, parse_dates=["Date"], dtype={"Ticker": "string"}, chunksize=chunksize):
+        if incl is not None:
+            chunk = chunk[chunk["Ticker"].isin(incl)]
+        if since is not None:
+            chunk = chunk[chunk["Date"] >= since]
+        if not chunk.empty:
+            kept.append(chunk)
+    if not kept:
+        return pd.read_csv(path, parse_dates=["Date"], dtype={"Ticker": "string"}, nrows=0)
+    return pd.concat(kept, ignore_index=True)
+
+def max_date(path: str | Path, chunksize: int = STREAM_ROWS) -> pd.Timestamp:
+    """Latest Date in the file, reading only the Date column."""
+    out = pd.NaT
+    for chunk in pd.read_csv(path, usecols=["Date"], parse_dates=["Date"], chunksize=chunksize):
+        m = chunk["Date"].max()
+        if pd.notna(m) and (pd.isna(out) or m > out):
+            out = m
+    return out
+
+def iter_ticker_frames(path: str | Path, tickers_per_frame: int = 250, since=None,
+                       chunksize: int = STREAM_ROWS):
+    """
+    Yield DataFrames holding complete histories for up to `tickers_per_frame` tickers.
+
+    Relies on the file being grouped by Ticker (build_data writes it sorted by
+    Ticker, Date); a ticker that reappears after its block ended raises ValueError.
+    Peak memory is one row chunk plus one frame, independent of universe size.
+    """
+    since = pd.Timestamp(since) if since is not None else None
+    pending: list[pd.DataFrame] = []
+    n_pending = 0
+    done: set[str] = set()
+
+    for chunk in pd.read_csv(path, parse_dates=["Date"], dtype={"Ticker": "string"}, chunksize=chunksize):
+        if since is not None:
+            chunk = chunk[chunk["Date"] >= since]
+        if chunk.empty:
+            continue
+        # split by ticker, preserving file order
+        for t, g in chunk.groupby("Ticker", sort=False):
+            if t in done:
+                raise ValueError(f"{path}: rows for {t} are not contiguous; re-sort by Ticker, Date")
+            if pending and pending[-1]["Ticker"].iat[0] == t:
+                pending[-1] = pd.concat([pending[-1], g])
+                continue
+            if pending:
+                done.add(str(pending[-1]["Ticker"].iat[0]))
+            pending.append(g)
+            n_pending += 1
+            # the newest ticker may continue in the next chunk; emit everything before it
+            if n_pending > tickers_per_frame:
+                yield pd.concat(pending[:-1], ignore_index=True)
+                pending, n_pending = pending[-1:], 1
+    if pending:
+        yield pd.concat(pending, ignore_index=True)
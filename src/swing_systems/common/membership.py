@@ -0,0 +1,149 @@
+import os
+import numpy as np
+import pandas as pd
+from .io import atomic_path
+
+DEFAULT_PATH = "state/watchlist_history.npz"
+
+def _day(d) -> np.datetime64:
+    return np.datetime64(pd.Timestamp(d).normalize().date(), "D")
+
+class MembershipHistory:
+    """
+    Daily per-strategy watchlist membership as packed bitsets.
+
+    Tickers get a stable, append-only column index; each (strategy, date) is one
+    row of np.packbits over that index. Everything lives in a single compressed
+    .npz, so a year of four watchlists over 5,000 names is a few hundred KB.
+    Lookups are as-of: a date with no recorded build uses the latest prior build.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self.tickers: list[str] = []
+        self._index: dict[str, int] = {}
+        self._dates: dict[str, np.ndarray] = {}
+        self._bits: dict[str, np.ndarray] = {}
+        if os.path.exists(path):
+            self._load()
+
+    # ---------- persistence ----------
+
+    def _load(self) -> None:
+        with np.load(self.path, allow_pickle=False) as z:
+            self.tickers = [str(t) for t in z["tickers"]]
+            for key in z.files:
+                if key.endswith("__dates"):
+                    strat = key[: -len("__dates")]
+                    self._dates[strat] = z[key].astype("datetime64[D]")
+                    self._bits[strat] = z[f"{strat}__bits"]
+        self._index = {t: i for i, t in enumerate(self.tickers)}
+
+    def save(self) -> None:
+        arrays = {"tickers": np.array(self.tickers, dtype=str)}
+        for strat in self._dates:
+            arrays[f"{strat}__dates"] = self._dates[strat]
+            arrays[f"{strat}__bits"] = self._width(self._bits[strat])
+        with atomic_path(self.path) as tmp:
+            with open(tmp, "wb") as f:
+                np.savez_compressed(f, **arrays)
+
+    # ---------- writes ----------
+
+    def _width(self, bits: np.ndarray) -> np.ndarray:
+        """Zero-pad older rows when the ticker index has grown since they were written."""
+        nbytes = (len(self.tickers) + 7) // 8
+        if bits.shape[-1] < nbytes:
+            pad = [(0, 0)] * (bits.ndim - 1) + [(0, nbytes - bits.shape[-1])]
+            bits = np.pad(bits, pad)
+        return bits
+
+    def _ensure_tickers(self, tickers) -> np.ndarray:
+        cols = []
+        for t in tickers:
+            t = str(t).strip().upper()
+            if t not in self._index:
+                self._index[t] = len(self.tickers)
+                self.tickers.append(t)
+            cols.append(self._index[t])
+        return np.asarray(cols, dtype=np.int64)
+
+    def record(self, strategy: str, date, tickers) -> None:
+        """Store (or overwrite) the membership of `strategy` on `date`."""
+        cols = self._ensure_tickers(tickers)
+        row = np.zeros(len(self.tickers), dtype=bool)
+        row[cols] = True
+        packed = np.packbits(row)[None, :]
+        d = _day(date)
+
+        dates = self._dates.get(strategy, np.array([], dtype="datetime64[D]"))
+        bits = self._width(self._bits.get(strategy, np.zeros((0, packed.shape[1]), dtype=np.uint8)))
+        pos = int(np.searchsorted(dates, d))
+        if pos < len(dates) and dates[pos] == d:
+            bits[pos] = packed[0]
+        else:
+            dates = np.insert(dates, pos, d)
+            bits = np.insert(bits, pos, packed[0], axis=0)
+        self._dates[strategy], self._bits[strategy] = dates, bits
+
+    # ---------- queries ----------
+
+    def strategies(self) -> list[str]:
+        return sorted(self._dates)
+
+    def dates(self, strategy: str) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(self._dates.get(strategy, np.array([], dtype="datetime64[D]")))
+
+    def _unpack(self, bits: np.ndarray) -> np.ndarray:
+        return np.unpackbits(self._width(bits), axis=-1, count=len(self.tickers)).astype(bool)
+
+    def _row_for(self, strategy: str, date) -> int:
+        dates = self._dates.get(strategy)
+        if dates is None or len(dates) == 0:
+            return -1
+        return int(np.searchsorted(dates, _day(date), side="right")) - 1
+
+    def eligible_on(self, strategy: str, date) -> list[str]:
+        """Tickers on the strategy's watchlist as of `date`."""
+        r = self._row_for(strategy, date)
+        if r < 0:
+            return []
+        mask = self._unpack(self._bits[strategy][r])
+        return [self.tickers[i] for i in np.flatnonzero(mask)]
+
+    def eligible_between(self, strategy: str, start, end, how: str = "any") -> list[str]:
+        """
+        Tickers eligible at some point ("any") or throughout ("all") of [start, end],
+        counting the build in force at `start` as well as every build inside the range.
+        """
+        if how not in ("any", "all"):
+            raise ValueError(f"how must be 'any' or 'all', got {how!r}")
+        dates = self._dates.get(strategy)
+        if dates is None or len(dates) == 0:
+            return []
+        lo = max(self._row_for(strategy, start), 0)
+        hi = int(np.searchsorted(dates, _day(end), side="right"))
+        if hi <= lo:
+            return []
+        rows = self._width(self._bits[strategy][lo:hi])
+        agg = np.bitwise_or.reduce(rows, axis=0) if how == "any" else np.bitwise_and.reduce(rows, axis=0)
+        mask = np.unpackbits(agg, count=len(self.tickers)).astype(bool)
+        return [self.tickers[i] for i in np.flatnonzero(mask)]
+
+    def eligible_mask(self, strategy: str, df: pd.DataFrame) -> pd.Series:
+        """
+        Boolean Series aligned to df: was row (Ticker, Date) on the watchlist as of
+        its Date? Fully vectorized, so backtests can filter a whole panel at once.
+        """
+        dates = self._dates.get(strategy)
+        if dates is None or len(dates) == 0 or df.empty:
+            return pd.Series(False, index=df.index)
+        day = pd.to_datetime(df["Date"]).values.astype("datetime64[D]")
+        r = np.searchsorted(dates, day, side="right") - 1
+        c = df["Ticker"].astype(str).str.strip().str.upper().map(self._index).fillna(-1).to_numpy(dtype=np.int64)
+        ok = (r >= 0) & (c >= 0)
+        bits = self._width(self._bits[strategy])
+        out = np.zeros(len(df), dtype=bool)
+        rr, cc = r[ok], c[ok]
+        out[ok] = ((bits[rr, cc >> 3] >> (7 - (cc & 7))) & 1) == 1
+        return pd.Series(out, index=df.index)
@@ -0,0 +1,162 @@
+"""
+Minimal fingerprinted DAG runner.
+
+Each stage declares the files and values it depends on. Before running, the
+stage's fingerprint (sha256 over those inputs) is compared with the one stored
+after its last successful run; a match with all outputs present means the
+stage is skipped. Stages whose dependencies are finished run concurrently.
+"""
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from .io import atomic_write_text
+
+_BUF = 1 << 20
+
+def file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_BUF):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _expand(patterns) -> list[str]:
+    out = []
+    for p in patterns:
+        hits = sorted(glob.glob(p, recursive=True))
+        out.extend(hits if hits else [p])
+    return out
+
+class Stage:
+    """
+    One pipeline step. `run` is an argv list (executed as a subprocess) or a
+    zero-argument callable. `inputs`/`outputs` are paths or glob patterns;
+    `params` are extra values that belong in the fingerprint (args, dates, ...).
+    `complete` is an optional zero-argument check run after a successful
+    execution; when it returns False the fingerprint is not recorded, so the
+    next run retries the stage (e.g. a data fetch that came back short).
+    """
+
+    def __init__(self, name, run, deps=(), inputs=(), outputs=(), params=None, complete=None):
+        self.name = name
+        self.run = run
+        self.deps = list(deps)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.params = params or {}
+        self.complete = complete
+
+    def fingerprint(self) -> str:
+        h = hashlib.sha256()
+        h.update(self.name.encode())
+        cmd = self.run if isinstance(self.run, (list, tuple)) else getattr(self.run, "__qualname__", repr(self.run))
+        h.update(json.dumps([cmd, self.params], sort_keys=True, default=str).encode())
+        for p in _expand(self.inputs):
+            h.update(p.encode())
+            h.update(file_digest(p).encode() if os.path.isfile(p) else b"<missing>")
+        return h.hexdigest()
+
+    def outputs_exist(self) -> bool:
+        return all(glob.glob(p, recursive=True) for p in self.outputs)
+
+    def execute(self) -> None:
+        if isinstance(self.run, (list, tuple)):
+            subprocess.run(list(self.run), check=True)
+        else:
+            self.run()
+
+def _load(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def run_pipeline(stages: list[Stage], state_path: str, workers: int = 4,
+                 force: bool = False, dry_run: bool = False) -> dict[str, str]:
+    """
+    Execute `stages` in dependency order. Returns {stage: "ran" | "skipped" | "failed" | "blocked"}.
+    A stage's fingerprint is recorded only after it succeeds, and is re-taken at that
+    point so files a stage both reads and writes (e.g. a ledger) don't force a rerun.
+    """
+    by_name = {s.name: s for s in stages}
+    for s in stages:
+        missing = [d for d in s.deps if d not in by_name]
+        if missing:
+            raise ValueError(f"stage {s.name!r} depends on unknown stage(s) {missing}")
+
+    prints = _load(state_path)
+    status: dict[str, str] = {}
+    pending = {s.name for s in stages}
+    running = {}
+
+    def ready(name):
+        return all(status.get(d) in ("ran", "skipped") for d in by_name[name].deps)
+
+    def blocked(name):
+        return any(status.get(d) in ("failed", "blocked") for d in by_name[name].deps)
+
+    def save():
+        atomic_write_text(state_path, json.dumps(prints, indent=2, sort_keys=True))
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        while pending or running:
+            before = len(pending)
+            for name in sorted(pending):
+                if blocked(name):
+                    status[name] = "blocked"
+                    pending.discard(name)
+                    print(f"[{name}] blocked by failed dependency", file=sys.stderr)
+                    continue
+                if not ready(name):
+                    continue
+                pending.discard(name)
+                st = by_name[name]
+                fp = st.fingerprint()
+                if not force and prints.get(name) == fp and st.outputs_exist():
+                    status[name] = "skipped"
+                    print(f"[{name}] unchanged, skipped")
+                    continue
+                if dry_run:
+                    status[name] = "ran"
+                    print(f"[{name}] would run")
+                    continue
+                print(f"[{name}] running")
+                running[pool.submit(_timed, st)] = name
+            if not running:
+                if pending and len(pending) == before:
+                    raise ValueError(f"dependency cycle among stages {sorted(pending)}")
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = running.pop(fut)
+                try:
+                    secs = fut.result()
+                except Exception as e:
+                    status[name] = "failed"
+                    prints.pop(name, None)
+                    print(f"[{name}] FAILED: {e!r}", file=sys.stderr)
+                else:
+                    status[name] = "ran"
+                    st = by_name[name]
+                    if st.complete is None or st.complete():
+                        prints[name] = st.fingerprint()
+                        print(f"[{name}] done ({secs:.1f}s)")
+                    else:
+                        prints.pop(name, None)
+                        print(f"[{name}] done ({secs:.1f}s) but incomplete; not recorded, next run retries")
+                if not dry_run:
+                    save()
+    return status
+
+def _timed(stage: Stage) -> float:
+    t0 = time.perf_counter()
+    stage.execute()
+    return time.perf_counter() - t0
@@ -0,0 +1,125 @@
+"""
+Monte Carlo robustness of a strategy's closed trades.
+
+Every simulation is a row of an (n_sims, n_lots) return matrix: lots are
+resampled and costed one by one, then summed per exit day for the equity
+curve. Rows are built in batches with NumPy and scored with cumulative
+products, so there are no per-simulation Python loops. Batches are spread
+across processes.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+MODES = ("bootstrap", "shuffle", "slippage")
+METRICS = ("CAGR", "MaxDD", "WinRate")
+BATCH_CELLS = 4_000_000  # sims * lots per batch (~32 MB of float64)
+
+def trade_returns(state: pd.DataFrame) -> tuple[np.ndarray, np.ndarray, float]:
+    """
+    Simple returns of closed lots in exit order, each lot's period (exit-day
+    ordinal) and the years spanned (first entry to last exit). Lots closing on
+    the same day share a period: each held its own slice of equity, so their
+    P&L adds up for that day instead of compounding as if they were sequential.
+    """
+    s = state[state["Status"].astype(str).str.lower() == "closed"].copy()
+    for c in ("EntryPrice", "ExitPrice"):
+        s[c] = pd.to_numeric(s[c], errors="coerce")
+    for c in ("EntryDate", "ExitDate"):
+        s[c] = pd.to_datetime(s[c], errors="coerce")
+    s = s.dropna(subset=["EntryPrice", "ExitPrice", "EntryDate", "ExitDate"])
+    s = s[s["EntryPrice"] > 0].sort_values(["ExitDate", "EntryDate"], kind="stable")
+    r = (s["ExitPrice"] / s["EntryPrice"] - 1.0).to_numpy(dtype=np.float64)
+    period = pd.factorize(s["ExitDate"].dt.normalize(), sort=True)[0].astype(np.int64)
+    if s.empty:
+        return r, period, 0.0
+    days = (s["ExitDate"].max() - s["EntryDate"].min()).days
+    return r, period, max(days, 1) / 365.25
+
+def period_starts(period: np.ndarray) -> np.ndarray:
+    """Offsets where each period's run of lots begins (lots are in exit order)."""
+    period = np.asarray(period)
+    return np.flatnonzero(np.r_[True, period[1:] != period[:-1]]) if len(period) else np.zeros(0, np.int64)
+
+def metric_names(years: float) -> tuple[str, ...]:
+    """METRICS, with total return in place of CAGR when the span is under a year."""
+    return METRICS if years >= 1 else ("TotalReturn",) + METRICS[1:]
+
+def score(R: np.ndarray, starts: np.ndarray, years: float, fraction: float) -> np.ndarray:
+    """
+    (3, n_sims) array of CAGR, max drawdown and win rate for each row of R.
+    Columns of R are lots; `starts` (see period_starts) groups them into periods
+    whose summed P&L drives the equity curve, while win rate counts lots.
+    Spans under a year report total return: annualizing a few days of P&L
+    blows small moves up to absurd rates.
+    """
+    win = (R > 0).mean(axis=1)
+    growth = np.add.reduceat(R, starts, axis=1)
+    growth *= R.dtype.type(fraction)
+    growth += 1
+    np.maximum(growth, 0, out=growth)  # a position can't lose more than it risks
+    equity = np.cumprod(growth, axis=1, out=growth)
+    final = equity[:, -1].astype(np.float64)
+    peak = np.maximum.accumulate(equity, axis=1)
+    np.maximum(peak, 1, out=peak)
+    np.divide(equity, peak, out=peak)
+    maxdd = 1.0 - peak.min(axis=1).astype(np.float64)
+    if years < 1:
+        cagr = final - 1.0
+    else:
+        cagr = np.power(final, 1.0 / years) - 1.0
+    return np.vstack([cagr, maxdd, win])
+
+def _simulate(args) -> np.ndarray:
+    mode, r, starts, n_sims, years, fraction, slip_bps, seed = args
+    rng = np.random.default_rng(seed)
+    r = r.astype(np.float32)  # half the memory traffic; ample precision for percentile bands
+    n = len(r)
+    rows = max(1, BATCH_CELLS // max(n, 1))
+    out = []
+    for lo in range(0, n_sims, rows):
+        b = min(rows, n_sims - lo)
+        if mode == "bootstrap":
+            R = r[rng.integers(0, n, size=(b, n))]
+        elif mode == "shuffle":
+            R = rng.permuted(np.broadcast_to(r, (b, n)), axis=1)
+        elif mode == "slippage":
+            # round-trip cost per trade, exponential around the given per-side bps
+            R = rng.exponential(2.0 * slip_bps / 1e4, size=(b, n)).astype(np.float32)
+            np.subtract(r[None, :], R, out=R)
+        else:
+            raise ValueError(f"unknown mode {mode!r}; expected one of {MODES}")
+        # lots are resampled and perturbed in place; each slot keeps its exit day
+        out.append(score(R, starts, years, fraction))
+    return np.hstack(out)
+
+def simulate(r: np.ndarray, period: np.ndarray, years: float, mode: str, n_sims: int,
+             fraction: float = 0.1, slip_bps: float = 5.0, workers: int | None = None,
+             seed: int | None = None) -> np.ndarray:
+    """Run `n_sims` lot-level resamples of `mode`, split across `workers` processes. Returns (3, n_sims)."""
+    starts = period_starts(period)
+    workers = workers or os.cpu_count() or 1
+    parts = np.array_split(np.arange(n_sims), workers)
+    seeds = np.random.SeedSequence(seed).spawn(len(parts))
+    jobs = [(mode, r, starts, len(p), years, fraction, slip_bps, s) for p, s in zip(parts, seeds) if len(p)]
+    if len(jobs) == 1:
+        return _simulate(jobs[0])
+    with ProcessPoolExecutor(max_workers=len(jobs)) as pool:
+        return np.hstack(list(pool.map(_simulate, jobs)))
+
+def bands(r: np.ndarray, period: np.ndarray, years: float, n_sims: int = 10_000, modes=MODES,
+          fraction: float = 0.1, slip_bps: float = 5.0, pct=(5, 25, 50, 75, 95),
+          workers: int | None = None, seed: int | None = None) -> pd.DataFrame:
+    """Percentile bands per mode and metric, next to the metric of the actual trade sequence."""
+    observed = score(r[None, :], period_starts(period), years, fraction)[:, 0]
+    names = metric_names(years)
+    rows = []
+    for mode in modes:
+        sims = simulate(r, period, years, mode, n_sims, fraction, slip_bps, workers, seed)
+        q = np.nanpercentile(sims, pct, axis=1)
+        for i, m in enumerate(names):
+            row = {"Mode": mode, "Metric": m, "Observed": observed[i]}
+            row.update({f"P{p}": q[j, i] for j, p in enumerate(pct)})
+            rows.append(row)
+    return pd.DataFrame(rows)
@@ -0,0 +1,151 @@
+import os
+import pandas as pd
+from .adjustments import action_basis, load_actions
+from .io import atomic_to_csv, file_lock
+
+# timeframe -> pandas Period frequency. Weeks end Friday to match the US session week.
+TIMEFRAMES = {"1W": "W-FRI", "1M": "M"}
+
+BAR_COLS = ["Ticker", "PeriodStart", "Date", "Open", "High", "Low", "Close", "Volume"]
+
+def _freq(timeframe: str) -> str:
+    try:
+        return TIMEFRAMES[timeframe]
+    except KeyError:
+        raise ValueError(f"unknown timeframe {timeframe!r}; expected one of {sorted(TIMEFRAMES)}")
+
+def resample_bars(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    """
+    Aggregate daily OHLCV into weekly/monthly bars for every ticker in one groupby.
+    Date is the last trading day actually inside the period (so a partial current
+    week is labelled with its latest session); PeriodStart is the calendar start.
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=BAR_COLS)
+    d = df[["Ticker", "Date", "Open", "High", "Low", "Close", "Volume"]].copy()
+    d["Date"] = pd.to_datetime(d["Date"], errors="coerce")
+    d = d.dropna(subset=["Date"]).sort_values(["Ticker", "Date"])
+    d["PeriodStart"] = d["Date"].dt.to_period(_freq(timeframe)).dt.start_time
+    out = (
+        d.groupby(["Ticker", "PeriodStart"], sort=True)
+         .agg(Date=("Date", "last"), Open=("Open", "first"), High=("High", "max"),
+              Low=("Low", "min"), Close=("Close", "last"), Volume=("Volume", "sum"))
+         .reset_index()
+    )
+    return out[BAR_COLS]
+
+def cache_path_for(data_path: str, timeframe: str) -> str:
+    root, ext = os.path.splitext(str(data_path))
+    return f"{root}_{timeframe}{ext or '.csv'}"
+
+def _read_basis(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    b = pd.read_csv(path, dtype=str, keep_default_na=False)
+    return dict(zip(b["Ticker"], b["Basis"]))
+
+def load_bars(daily: pd.DataFrame, timeframe: str, cache_path: str | None = None,
+              rebuild: bool = False, basis: pd.Series | None = None) -> pd.DataFrame:
+    """
+    Higher-timeframe bars for the tickers in `daily`, backed by an on-disk cache.
+
+    Per ticker, only its latest cached period (which may still be forming) and
+    anything after it are recomputed; tickers new to the cache are built in full.
+    Cached tickers absent from `daily` are left untouched, so callers holding a
+    watchlist subset can share one cache. Pass rebuild=True after a history
+    rewrite (e.g. re-adjusted prices) to recompute the tickers in `daily` fully.
+
+    `basis` (Ticker -> token, see adjustments.action_basis) is kept in a
+    `<cache_path>.basis` sidecar; a ticker whose token changed since its bars
+    were cached, e.g. after a new split, is recomputed in full.
+    """
+    if cache_path is None:
+        return resample_bars(daily, timeframe)
+
+    tick = daily["Ticker"].astype(str)
+    names = set(tick)
+    basis_path = f"{cache_path}.basis"
+    # scanners run concurrently and share the cache: serialize read-modify-write
+    with file_lock(f"{cache_path}.lock"):
+        cached = pd.DataFrame(columns=BAR_COLS)
+        if os.path.exists(cache_path):
+            cached = pd.read_csv(cache_path, parse_dates=["PeriodStart", "Date"], dtype={"Ticker": "string"})
+        cached["PeriodStart"] = pd.to_datetime(cached["PeriodStart"])
+        cached_tick = cached["Ticker"].astype(str)
+
+        cutoff = cached.groupby(cached_tick)["PeriodStart"].max()
+        seen = _read_basis(basis_path)
+        if rebuild:
+            cutoff = cutoff[~cutoff.index.isin(names)]
+        elif basis is not None:
+            moved = [t for t, b in basis.items() if str(t) in names and seen.get(str(t)) != b]
+            cutoff = cutoff[~cutoff.index.isin(moved)]
+        row_cut = pd.to_datetime(tick.map(cutoff.to_dict()))  # NaT for tickers new to the cache
+        fresh = daily[row_cut.isna() | (pd.to_datetime(daily["Date"]) >= row_cut)]
+
+        # drop the cached periods of `daily` tickers that are about to be recomputed
+        old_cut = pd.to_datetime(cached_tick.map(cutoff.to_dict()))
+        in_frame = cached_tick.isin(names)
+        stale = in_frame & (old_cut.isna() | (cached["PeriodStart"] >= old_cut))
+        keep = cached[~stale]
+
+        merged = (
+            pd.concat([keep, resample_bars(fresh, timeframe)], ignore_index=True)
+              .drop_duplicates(subset=["Ticker", "PeriodStart"], keep="last")
+              .sort_values(["Ticker", "PeriodStart"])
+              .reset_index(drop=True)
+        )
+        atomic_to_csv(merged, cache_path)
+        if basis is not None:
+            seen.update({str(t): b for t, b in basis.items() if str(t) in names})
+            atomic_to_csv(pd.DataFrame({"Ticker": list(seen), "Basis": list(seen.values())}), basis_path)
+
+    return merged[merged["Ticker"].astype(str).isin(names)].reset_index(drop=True)
+
+def align_to_daily(daily: pd.DataFrame, bars: pd.DataFrame, timeframe: str,
+                   cols: list[str], prefix: str | None = None) -> pd.DataFrame:
+    """
+    Attach higher-timeframe columns to each daily row, taken from the last *completed*
+    period before the row's own period (no look-ahead into the forming bar).
+    """
+    prefix = prefix if prefix is not None else f"{timeframe}_"
+    out = daily.copy()
+    out["PeriodStart"] = pd.to_datetime(out["Date"]).dt.to_period(_freq(timeframe)).dt.start_time
+    prev = bars.sort_values(["Ticker", "PeriodStart"])[["Ticker", "PeriodStart", *cols]].copy()
+    prev[cols] = prev.groupby("Ticker")[cols].shift(1)
+    prev = prev.rename(columns={c: f"{prefix}{c}" for c in cols})
+    merged = out.merge(prev, on=["Ticker", "PeriodStart"], how="left")
+    merged.index = out.index
+    return merged.drop(columns=["PeriodStart"])
+
+def htf_sma(bars: pd.DataFrame, n: int, col: str = "Close") -> pd.Series:
+    """n-period SMA of a higher-timeframe column, computed per ticker."""
+    s = pd.to_numeric(bars[col], errors="coerce")
+    return s.groupby(bars["Ticker"]).transform(lambda x: x.rolling(n, min_periods=n).mean())
+
+def _data_basis(daily: pd.DataFrame, data_path: str, actions_path: str | None) -> pd.Series | None:
+    """Adjustment basis of the tickers in `daily`, read from the factor table build_data keeps next to data_path."""
+    actions_path = actions_path or os.path.join(os.path.dirname(str(data_path)), "adjustments.csv")
+    if not os.path.exists(actions_path):
+        return None
+    mode_path = f"{data_path}.mode"
+    how = open(mode_path).read().strip() if os.path.exists(mode_path) else "split"
+    return action_basis(load_actions(actions_path), daily["Ticker"].astype(str).unique(), how)
+
+def with_timeframe(daily: pd.DataFrame, timeframe: str = "1W", sma: tuple[int, ...] = (),
+                   cols: tuple[str, ...] = ("Close",), data_path: str | None = None,
+                   actions_path: str | None = None) -> pd.DataFrame:
+    """
+    One-call entry point for strategies: daily frame plus prior-period `cols` and
+    `SMA<n>` columns from `timeframe` bars, e.g. `1W_Close`, `1W_SMA10`.
+    When data_path is given the bars are cached next to it (data/combined_1W.csv)
+    and a ticker's cached bars are rebuilt once its corporate actions change.
+    """
+    cache = cache_path_for(data_path, timeframe) if data_path else None
+    basis = _data_basis(daily, data_path, actions_path) if data_path else None
+    bars = load_bars(daily, timeframe, cache, basis=basis)
+    extra = list(cols)
+    for n in sma:
+        bars[f"SMA{n}"] = htf_sma(bars, n)
+        extra.append(f"SMA{n}")
+    return align_to_daily(daily, bars, timeframe, extra)
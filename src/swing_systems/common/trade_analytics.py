@@ -0,0 +1,182 @@
+"""
+Per-trade excursion analytics over the bar panel.
+
+The panel is laid out as one array sorted by (Ticker, Date), so each ticker's
+history is a contiguous slice. A (ticker, date) -> row offset index is a sorted
+int64 key array, and sparse tables over Low/High answer any range min/max with
+two lookups. Every trade is therefore O(1) after the one-off build, and all
+trades are answered in a handful of vectorized operations.
+"""
+import numpy as np
+import pandas as pd
+from .adjustments import price_factors
+
+class SparseTable:
+    """
+    Idempotent range-min or range-max over a fixed array, up to `max_span` long
+    ranges; longer queries raise rather than answer over a truncated range.
+    """
+
+    def __init__(self, values: np.ndarray, op=np.minimum, max_span: int | None = None):
+        v = np.asarray(values, dtype=np.float64)
+        n = len(v)
+        span = max(1, min(max_span or n, n))
+        levels = [v]
+        k = 1
+        # level j holds op over [i, i + 2**j); only as many levels as the longest query needs
+        while (1 << k) <= span:
+            prev = levels[-1]
+            half = 1 << (k - 1)
+            nxt = prev.copy()
+            nxt[: n - half] = op(prev[: n - half], prev[half:])
+            levels.append(nxt)
+            k += 1
+        self.op = op
+        self.span = span
+        self.table = np.vstack(levels)
+
+    def query(self, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+        """op over [lo, hi] inclusive, element-wise. Requires lo <= hi."""
+        lo = np.asarray(lo, dtype=np.int64)
+        hi = np.asarray(hi, dtype=np.int64)
+        length = hi - lo + 1
+        if length.size and length.max() > self.span:
+            raise ValueError(f"range of {length.max()} rows exceeds the table's max_span of {self.span}")
+        k = np.floor(np.log2(np.maximum(length, 1))).astype(np.int64)
+        return self.op(self.table[k, lo], self.table[k, hi - (1 << k) + 1])
+
+class BarIndex:
+    """
+    Bar panel plus (ticker, date) -> row lookup and Low/High range tables.
+    Queries never cross tickers, so `max_span` defaults to the longest ticker history.
+    """
+
+    def __init__(self, bars: pd.DataFrame, max_span: int | None = None):
+        b = bars[["Ticker", "Date", "Low", "High", "Close"]].copy()
+        b["Ticker"] = b["Ticker"].astype(str)
+        b["Date"] = pd.to_datetime(b["Date"], errors="coerce").dt.normalize()
+        for c in ("Low", "High", "Close"):
+            b[c] = pd.to_numeric(b[c], errors="coerce")
+        b = b.dropna(subset=["Date", "Low", "High"]).drop_duplicates(["Ticker", "Date"], keep="last")
+        b = b.sort_values(["Ticker", "Date"]).reset_index(drop=True)
+
+        self.tickers = pd.Index(sorted(b["Ticker"].unique()))
+        self.codes = self.tickers.get_indexer(b["Ticker"]).astype(np.int64)
+        self.days = b["Date"].values.astype("datetime64[D]").astype(np.int64)
+        self.keys = self._key(self.codes, self.days)  # sorted, since the panel is
+        self.dates = b["Date"].to_numpy()
+        self.close = b["Close"].to_numpy()
+        if max_span is None:
+            max_span = int(np.bincount(self.codes).max()) if len(self.codes) else 1
+        self.low = SparseTable(b["Low"].to_numpy(), np.minimum, max_span)
+        self.high = SparseTable(b["High"].to_numpy(), np.maximum, max_span)
+
+    @staticmethod
+    def _key(codes: np.ndarray, days: np.ndarray) -> np.ndarray:
+        return (codes << 32) + (days + (1 << 31))
+
+    def rows(self, tickers, dates, side: str) -> np.ndarray:
+        """
+        Row offsets of the first bar on/after (side="after") or last bar on/before
+        (side="before") each date for that ticker; -1 when the ticker has none.
+        """
+        codes = self.tickers.get_indexer(pd.Index(tickers).astype(str)).astype(np.int64)
+        dts = pd.to_datetime(pd.Series(dates)).reset_index(drop=True)
+        codes[dts.isna().to_numpy()] = -1
+        days = dts.fillna(pd.Timestamp(0)).values.astype("datetime64[D]").astype(np.int64)
+        keys = self._key(np.maximum(codes, 0), days)
+        if side == "after":
+            pos = np.searchsorted(self.keys, keys, side="left")
+        else:
+            pos = np.searchsorted(self.keys, keys, side="right") - 1
+        ok = (codes >= 0) & (pos >= 0) & (pos < len(self.keys))
+        ok[ok] &= self.codes[pos[ok]] == codes[ok]
+        return np.where(ok, pos, -1)
+
+def rebase(trades: pd.DataFrame, actions: pd.DataFrame, how: str = "split") -> pd.DataFrame:
+    """
+    Ledger with EntryPrice/ExitPrice moved from as-traded to the adjusted basis of
+    the bar panel, so a split before, during or after a lot doesn't show up as a
+    -50%/+100% excursion.
+    """
+    t = trades.copy()
+    if t.empty or actions.empty:
+        return t
+    for price, day in (("EntryPrice", "EntryDate"), ("ExitPrice", "ExitDate")):
+        keys = pd.DataFrame({"Ticker": t["Ticker"].astype(str), "Date": pd.to_datetime(t[day], errors="coerce")})
+        t[price] = pd.to_numeric(t[price], errors="coerce") * price_factors(keys, actions, how)
+    return t
+
+def excursions(trades: pd.DataFrame, index: BarIndex, asof=None) -> pd.DataFrame:
+    """
+    MAE/MFE, holding period and return for every lot in a ledger.
+
+    Entries and exits are assumed to fill at the close, so excursions are taken
+    over the bars after the entry bar up to and including the exit bar. Open lots
+    are marked to the last bar on or before `asof` (default: last bar available).
+    """
+    t = trades.copy()
+    t["EntryDate"] = pd.to_datetime(t["EntryDate"], errors="coerce")
+    t["ExitDate"] = pd.to_datetime(t["ExitDate"], errors="coerce")
+    t["EntryPrice"] = pd.to_numeric(t["EntryPrice"], errors="coerce")
+    t["ExitPrice"] = pd.to_numeric(t["ExitPrice"], errors="coerce")
+    t = t.dropna(subset=["Ticker", "EntryDate", "EntryPrice"])
+    t = t[t["EntryPrice"] > 0].reset_index(drop=True)
+    if t.empty:
+        return t
+
+    mark = pd.Timestamp(asof) if asof is not None else (
+        pd.Timestamp(index.dates.max()) if len(index.dates) else pd.NaT)
+    status = t["Status"].astype("string").str.lower() if "Status" in t.columns else pd.Series(pd.NA, index=t.index)
+    is_open = (status == "open").fillna(False) | (status.isna() & t["ExitDate"].isna())
+    until = t["ExitDate"].where(~is_open, mark)
+
+    r0 = index.rows(t["Ticker"], t["EntryDate"], side="after")
+    r1 = index.rows(t["Ticker"], until, side="before")
+    valid = (r0 >= 0) & (r1 >= r0)
+    has_path = valid & (r1 > r0)
+
+    min_low = np.full(len(t), np.nan)
+    max_high = np.full(len(t), np.nan)
+    if has_path.any():
+        lo, hi = r0[has_path] + 1, r1[has_path]
+        min_low[has_path] = index.low.query(lo, hi)
+        max_high[has_path] = index.high.query(lo, hi)
+
+    entry = t["EntryPrice"].to_numpy()
+    exit_px = t["ExitPrice"].to_numpy(dtype=np.float64, na_value=np.nan).copy()
+    mark_open = is_open.to_numpy() & valid
+    exit_px[mark_open] = index.close[r1[mark_open]]
+
+    out = t[["Ticker", "EntryDate", "EntryPrice", "Status", "ExitDate", "ExitPrice"]].copy()
+    out["MarkPrice"] = exit_px
+    out["Return"] = exit_px / entry - 1.0
+    out["MAE"] = np.minimum(np.nan_to_num(min_low / entry - 1.0, nan=0.0), 0.0)
+    out["MFE"] = np.maximum(np.nan_to_num(max_high / entry - 1.0, nan=0.0), 0.0)
+    out["HoldBars"] = np.where(valid, r1 - r0, np.nan)
+    out["HoldDays"] = (until - t["EntryDate"]).dt.days
+    out["Open"] = is_open.to_numpy()
+    out.loc[~valid, ["Return", "MAE", "MFE"]] = np.nan
+    return out
+
+def summarize(ex: pd.DataFrame, strategy: str) -> dict:
+    """One row of per-strategy statistics from `excursions` output (closed lots only)."""
+    c = ex[~ex["Open"]].dropna(subset=["Return"]) if not ex.empty else ex
+    n = len(c)
+    if n == 0:
+        return {"Strategy": strategy, "Trades": 0, "Open": int(ex["Open"].sum()) if not ex.empty else 0}
+    mfe = c["MFE"].mean()
+    return {
+        "Strategy": strategy,
+        "Trades": n,
+        "Open": int(ex["Open"].sum()),
+        "WinRate": float((c["Return"] > 0).mean()),
+        "AvgReturn": float(c["Return"].mean()),
+        "MedianReturn": float(c["Return"].median()),
+        "AvgMAE": float(c["MAE"].mean()),
+        "P90MAE": float(c["MAE"].quantile(0.10)),  # MAE is <= 0; 10th pct = 90% worst-case bound
+        "AvgMFE": float(mfe),
+        "MFECapture": float(c["Return"].mean() / mfe) if mfe > 0 else np.nan,
+        "AvgHoldBars": float(c["HoldBars"].mean()),
+        "AvgHoldDays": float(c["HoldDays"].mean()),
+    }
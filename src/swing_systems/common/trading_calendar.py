@@ -0,0 +1,156 @@
+"""
+Offline NYSE session calendar.
+
+Holidays are generated from the exchange's standing rules (plus a short list of
+one-off closures), so nothing is downloaded. Sessions are held as a sorted
+datetime64[D] array; every lookup is a vectorized searchsorted over it.
+"""
+import datetime as dt
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+FIRST_YEAR = 1990
+LAST_YEAR = 2040
+
+# unscheduled full-day closures (weather, national days of mourning)
+SPECIAL_CLOSURES = [
+    "2001-09-11", "2001-09-12", "2001-09-13", "2001-09-14",
+    "2004-06-11", "2007-01-02", "2012-10-29", "2012-10-30",
+    "2018-12-05", "2025-01-09",
+]
+
+def _easter(year: int) -> dt.date:
+    """Gregorian Easter Sunday (anonymous algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return dt.date(year, month, day + 1)
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> dt.date:
+    """n-th `weekday` (Mon=0) of the month; n=-1 for the last one."""
+    if n > 0:
+        d = dt.date(year, month, 1)
+        d += dt.timedelta(days=(weekday - d.weekday()) % 7)
+        return d + dt.timedelta(weeks=n - 1)
+    nxt = dt.date(year + (month == 12), month % 12 + 1, 1)
+    d = nxt - dt.timedelta(days=1)
+    return d - dt.timedelta(days=(d.weekday() - weekday) % 7)
+
+def _observed(d: dt.date) -> dt.date:
+    """Saturday holidays move to Friday, Sunday to Monday."""
+    if d.weekday() == 5:
+        return d - dt.timedelta(days=1)
+    if d.weekday() == 6:
+        return d + dt.timedelta(days=1)
+    return d
+
+def nyse_holidays(year: int) -> list[dt.date]:
+    out = []
+    ny = dt.date(year, 1, 1)
+    if ny.weekday() != 5:  # NYSE does not observe a Saturday New Year on the prior Friday
+        out.append(_observed(ny))
+    if year >= 1998:
+        out.append(_nth_weekday(year, 1, 0, 3))   # MLK day
+    out.append(_nth_weekday(year, 2, 0, 3))       # Washington's birthday
+    out.append(_easter(year) - dt.timedelta(days=2))  # Good Friday
+    out.append(_nth_weekday(year, 5, 0, -1))      # Memorial day
+    if year >= 2022:
+        out.append(_observed(dt.date(year, 6, 19)))   # Juneteenth
+    out.append(_observed(dt.date(year, 7, 4)))
+    out.append(_nth_weekday(year, 9, 0, 1))       # Labor day
+    out.append(_nth_weekday(year, 11, 3, 4))      # Thanksgiving
+    out.append(_observed(dt.date(year, 12, 25)))
+    return sorted(out)
+
+def nyse_half_days(year: int, sessions: set[dt.date]) -> list[dt.date]:
+    """13:00 closes: Jul 3, the day after Thanksgiving, Dec 24 (when they are sessions)."""
+    cands = [
+        dt.date(year, 7, 3),
+        _nth_weekday(year, 11, 3, 4) + dt.timedelta(days=1),
+        dt.date(year, 12, 24),
+    ]
+    return [d for d in cands if d in sessions]
+
+class TradingCalendar:
+    def __init__(self, first_year: int = FIRST_YEAR, last_year: int = LAST_YEAR):
+        hol = {h for y in range(first_year, last_year + 1) for h in nyse_holidays(y)}
+        hol |= {dt.date.fromisoformat(s) for s in SPECIAL_CLOSURES}
+        days = pd.bdate_range(f"{first_year}-01-01", f"{last_year}-12-31")
+        days = days[~days.isin(pd.DatetimeIndex(sorted(hol)))]
+        sess_set = set(days.date)
+
+        self.sessions = days.values.astype("datetime64[D]")
+        self.holidays = np.array(sorted(h for h in hol if h.weekday() < 5), dtype="datetime64[D]")
+        self.half_days = np.array(
+            [d for y in range(first_year, last_year + 1) for d in nyse_half_days(y, sess_set)],
+            dtype="datetime64[D]",
+        )
+
+    @staticmethod
+    def _days(dates) -> np.ndarray:
+        return pd.to_datetime(np.atleast_1d(dates)).values.astype("datetime64[D]")
+
+    def _wrap(self, idx: np.ndarray, like):
+        out = pd.DatetimeIndex(self.sessions[np.clip(idx, 0, len(self.sessions) - 1)])
+        return out[0] if np.ndim(like) == 0 and not isinstance(like, (pd.Series, pd.Index)) else out
+
+    def is_session(self, dates) -> np.ndarray:
+        d = self._days(dates)
+        i = np.searchsorted(self.sessions, d)
+        return (i < len(self.sessions)) & (self.sessions[np.minimum(i, len(self.sessions) - 1)] == d)
+
+    def is_half_day(self, dates) -> np.ndarray:
+        return np.isin(self._days(dates), self.half_days)
+
+    def previous_session(self, dates, inclusive: bool = True):
+        """Latest session <= date (or < date when inclusive=False)."""
+        i = np.searchsorted(self.sessions, self._days(dates), side="right" if inclusive else "left") - 1
+        return self._wrap(i, dates)
+
+    def next_session(self, dates, inclusive: bool = False):
+        """Earliest session > date (or >= date when inclusive=True)."""
+        i = np.searchsorted(self.sessions, self._days(dates), side="left" if inclusive else "right")
+        return self._wrap(i, dates)
+
+    def session_position(self, dates) -> np.ndarray:
+        """Ordinal of the latest session <= date; differences count sessions."""
+        return np.searchsorted(self.sessions, self._days(dates), side="right") - 1
+
+    def sessions_between(self, start, end) -> pd.DatetimeIndex:
+        """Sessions in [start, end]."""
+        lo = np.searchsorted(self.sessions, self._days(start)[0], side="left")
+        hi = np.searchsorted(self.sessions, self._days(end)[0], side="right")
+        return pd.DatetimeIndex(self.sessions[lo:hi])
+
+    def expected_bars(self, start, end) -> np.ndarray:
+        """Number of sessions in [start, end], element-wise over array-like starts/ends."""
+        lo = np.searchsorted(self.sessions, self._days(start), side="left")
+        hi = np.searchsorted(self.sessions, self._days(end), side="right")
+        return np.maximum(hi - lo, 0)
+
+    def sessions_behind(self, last_bar, asof) -> np.ndarray:
+        """Sessions between each ticker's last bar and `asof` (0 = up to date)."""
+        return np.maximum(self.session_position(asof) - self.session_position(last_bar), 0)
+
+@lru_cache(maxsize=1)
+def get_calendar() -> TradingCalendar:
+    return TradingCalendar()
+
+def stale_tickers(df: pd.DataFrame, asof) -> pd.Series:
+    """
+    Sessions each ticker is behind `asof`, for tickers whose last bar is older.
+    One searchsorted over the per-ticker last dates, so O(1) work per ticker.
+    """
+    if df is None or df.empty:
+        return pd.Series(dtype="int64")
+    last = pd.to_datetime(df["Date"]).groupby(df["Ticker"]).max()
+    behind = pd.Series(get_calendar().sessions_behind(last.values, asof), index=last.index)
+    return behind[behind > 0]
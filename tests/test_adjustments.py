@@ -0,0 +1,14 @@
+import pandas as pd
+from swing_systems.common.adjustments import ACTION_COLS, extract_actions
+
+def test_extract_actions_without_action_columns():
+    dl = pd.DataFrame({"Date": pd.bdate_range("2025-01-02", periods=3), "Ticker": "AAA", "Close": 1.0})
+    ev = extract_actions(dl)
+    assert ev.empty and list(ev.columns) == ACTION_COLS
+
+def test_extract_actions_keeps_split_and_dividend_rows():
+    dl = pd.DataFrame({"Date": pd.bdate_range("2025-01-02", periods=3), "Ticker": "AAA",
+                       "Stock Splits": [0.0, 2.0, 0.0], "Dividends": [0.0, 0.0, 0.5]})
+    ev = extract_actions(dl)
+    assert ev["Split"].tolist() == [2.0, 1.0]
+    assert ev["Dividend"].tolist() == [0.0, 0.5]
@@ -0,0 +1,107 @@
+import datetime as dt
+import pandas as pd
+from swing_systems.bin import build_data
+
+def test_selection_roundtrip_keeps_rank_order(tmp_path):
+    p = tmp_path / "selected_tickers.txt"
+    build_data.write_selection(p, dt.date(2025, 10, 17), ["MSFT", "AAPL", "ZM"])
+    assert build_data.read_selection(p) == ("2025-10-17", ["MSFT", "AAPL", "ZM"])
+
+def test_plan_fetch_starts_each_ticker_at_first_missing_session():
+    have = pd.DataFrame({"Ticker": ["A", "A", "B"],
+                         "Date": pd.to_datetime(["2025-07-02", "2025-07-03", "2025-06-30"])})
+    plan = build_data.plan_fetch(have, ["A", "B", "C"], "2025-01-01", dt.date(2025, 7, 3))
+    assert plan == {"2025-07-01": ["B"], "2025-01-01": ["C"]}
+
+
+class FakeYF:
+    """
+    yfinance stand-in: serves split-adjusted bars the way Yahoo does, i.e. adjusted
+    for every split that has happened by `now`, with action columns in the window.
+    """
+
+    def __init__(self, raw: pd.DataFrame, events: dict):
+        self.raw = raw.set_index("Date")
+        self.events = {pd.Timestamp(k): v for k, v in events.items()}
+        self.now = None
+
+    def download(self, tickers, start=None, end=None, **kwargs):
+        now = pd.Timestamp(self.now)
+        d = self.raw[(self.raw.index >= pd.Timestamp(start)) & (self.raw.index < pd.Timestamp(end))
+                     & (self.raw.index <= now)].copy()
+        factor = pd.Series(1.0, index=d.index)
+        for day, (split, _) in self.events.items():
+            if split and day <= now:
+                factor[d.index < day] *= split
+        for c in ("Open", "High", "Low", "Close"):
+            d[c] = d[c] / factor
+        d["Volume"] = d["Volume"] * factor
+        d["Stock Splits"] = [self.events.get(x, (0, 0))[0] for x in d.index]
+        d["Dividends"] = [self.events.get(x, (0, 0))[1] for x in d.index]
+        d.index.name = "Date"
+        return d
+
+
+def _run(monkeypatch, tmp_path, fake, now, adjust="split", start="2025-03-03"):
+    fake.now = now
+    uni = tmp_path / "universe.yaml"
+    uni.write_text(f"universe: [XYZ]\ndata_path: {tmp_path / 'data' / 'combined.csv'}\n")
+    monkeypatch.setattr(build_data.yf, "download", fake.download)
+    monkeypatch.setattr(build_data, "actions_horizon",
+                        lambda: pd.Timestamp(now).date() + dt.timedelta(days=1))
+    monkeypatch.setattr("sys.argv", ["build_data", "--universe", str(uni), "--start", start,
+                                     "--end", now, "--multi", "--sleep", "0", "--adjust", adjust])
+    build_data.main()
+    return pd.read_csv(tmp_path / "data" / "combined.csv", parse_dates=["Date"]).set_index("Date")
+
+
+def _fake():
+    dates = pd.bdate_range("2025-03-03", "2025-03-21")
+    close = [100.0] * 7 + [50.0] * (len(dates) - 7)   # 2:1 split effective 2025-03-12
+    raw = pd.DataFrame({"Date": dates, "Open": close, "High": close, "Low": close,
+                        "Close": close, "Volume": 1000.0})
+    # dividend of 1.00 on 03-06 against a 100 prior close; split on 03-12
+    return FakeYF(raw, {"2025-03-06": (0, 1.0), "2025-03-12": (2.0, 0)})
+
+
+def test_cold_start_with_dividend_writes_adjusted_view(monkeypatch, tmp_path):
+    out = _run(monkeypatch, tmp_path, _fake(), "2025-03-10")
+    assert out.index.max() == pd.Timestamp("2025-03-07")
+    assert (out["Close"] == 100.0).all()
+    acts = pd.read_csv(tmp_path / "data" / "adjustments.csv")
+    assert acts["DivFactor"].tolist() == [0.99]
+
+
+def test_split_on_ex_date_is_not_applied_twice(monkeypatch, tmp_path):
+    fake = _fake()
+    # evening of the ex-date: bars through 03-11 are served already halved
+    _run(monkeypatch, tmp_path, fake, "2025-03-12")
+    out = _run(monkeypatch, tmp_path, fake, "2025-03-13")
+    assert out.loc["2025-03-11", "Close"] == 50.0
+    assert out.loc["2025-03-12", "Close"] == 50.0
+    raw = pd.read_csv(tmp_path / "data" / "raw.csv", parse_dates=["Date"]).set_index("Date")
+    assert raw.loc["2025-03-11", "Close"] == 100.0
+
+
+def test_adjust_mode_change_rebuilds_cached_view(monkeypatch, tmp_path):
+    fake = _fake()
+    _run(monkeypatch, tmp_path, fake, "2025-03-10")
+    # same day, nothing to fetch: only the mode differs
+    out = _run(monkeypatch, tmp_path, fake, "2025-03-10", adjust="total")
+    assert out.loc["2025-03-05", "Close"] == 99.0
+
+
+def test_store_trimmed_to_window_and_universe(monkeypatch, tmp_path):
+    fake = _fake()
+    _run(monkeypatch, tmp_path, fake, "2025-03-10")
+    raw_path = tmp_path / "data" / "raw.csv"
+    raw = pd.read_csv(raw_path)
+    # a ticker that has since left the universe, still sitting in the persisted store
+    gone = raw.assign(Ticker="OLD")
+    pd.concat([raw, gone]).to_csv(raw_path, index=False)
+
+    out = _run(monkeypatch, tmp_path, fake, "2025-03-10", start="2025-03-05")
+    raw = pd.read_csv(raw_path, parse_dates=["Date"])
+    assert set(raw["Ticker"]) == {"XYZ"}
+    assert raw["Date"].min() == pd.Timestamp("2025-03-05")
+    assert out.index.min() == pd.Timestamp("2025-03-05")
@@ -0,0 +1,22 @@
+import sys
+import numpy as np
+import pandas as pd
+import yaml
+from swing_systems.bin import build_watchlists
+
+def _bars(ticker, last_day, n=300):
+    dates = pd.bdate_range(end=last_day, periods=n)
+    close = np.linspace(50.0, 100.0, n)
+    return pd.DataFrame({"Date": dates, "Ticker": ticker, "Open": close, "High": close * 1.02,
+                         "Low": close * 0.98, "Close": close, "Volume": 3_000_000})
+
+def test_stale_tickers_left_out_of_watchlists(tmp_path, monkeypatch):
+    combined = tmp_path / "combined.csv"
+    pd.concat([_bars("AAA", "2025-10-17"), _bars("OLD", "2025-10-16")]).to_csv(combined, index=False)
+    for stream in ([], ["--stream"]):
+        outdir = tmp_path / f"wl{len(stream)}"
+        monkeypatch.setattr(sys, "argv", ["build_watchlists", "--combined", str(combined), "--outdir", str(outdir),
+                                          "--lookback", "200", "--history", "", *stream])
+        build_watchlists.main()
+        with open(outdir / "double_seven.yaml") as f:
+            assert yaml.safe_load(f)["universe"] == ["AAA"]
@@ -0,0 +1,25 @@
+import pandas as pd
+from swing_systems.common.engine import Ctx, run_strategy
+
+def _frame(last_day):
+    dates = pd.bdate_range(end=last_day, periods=5)
+    return pd.concat([pd.DataFrame({"Date": dates, "Ticker": t, "Close": 10.0}) for t in ("AAA", "BBB")],
+                     ignore_index=True)
+
+def test_partially_stale_tickers_dropped():
+    df = _frame("2025-10-17")
+    df = df[~((df["Ticker"] == "BBB") & (df["Date"] == "2025-10-17"))]
+    ctx = Ctx(df, now="2025-10-18")
+    assert list(ctx.stale.index) == ["BBB"]
+    assert set(ctx.df["Ticker"]) == {"AAA"}
+
+def test_fully_stale_frame_detected_against_calendar(tmp_path):
+    # bars end Oct 10 but a run on Oct 18 expects the Oct 17 session
+    ctx = Ctx(_frame("2025-10-10"), now="2025-10-18")
+    assert set(ctx.stale.index) == {"AAA", "BBB"}
+    assert ctx.df.empty
+
+    calls = []
+    state = tmp_path / "state" / "s_state.csv"
+    run_strategy(ctx, str(state), str(tmp_path / "out"), lambda *a: calls.append(a) or ([], []))
+    assert not calls and not state.exists()
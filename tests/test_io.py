@@ -0,0 +1,48 @@
+import multiprocessing as mp
+import os
+import stat
+import time
+import pandas as pd
+import pytest
+from swing_systems.common import io
+from swing_systems.common.io import atomic_path, atomic_to_csv, file_lock
+
+def test_failed_write_leaves_target_and_no_temp(tmp_path):
+    target = tmp_path / "state.csv"
+    target.write_text("old\n")
+    with pytest.raises(RuntimeError):
+        with atomic_path(target) as tmp:
+            with open(tmp, "w") as f:
+                f.write("half")
+            raise RuntimeError("killed mid-write")
+    assert target.read_text() == "old\n"
+    assert [p.name for p in tmp_path.iterdir()] == ["state.csv"]
+
+def test_written_file_gets_umask_mode(tmp_path):
+    target = tmp_path / "out.csv"
+    atomic_to_csv(pd.DataFrame({"a": [1]}), target)
+    assert stat.S_IMODE(os.stat(target).st_mode) == 0o666 & ~io._UMASK
+    assert target.read_text() == "a\n1\n"
+
+def _hold(lock, log, tag):
+    with file_lock(lock):
+        with open(log, "a") as f:
+            f.write(f"{tag}+\n")
+        time.sleep(0.2)
+        with open(log, "a") as f:
+            f.write(f"{tag}-\n")
+
+@pytest.mark.skipif(io.fcntl is None, reason="no flock on this platform")
+def test_file_lock_serializes_processes(tmp_path):
+    lock, log = tmp_path / "x.lock", tmp_path / "log.txt"
+    ctx = mp.get_context("fork")
+    procs = [ctx.Process(target=_hold, args=(lock, log, t)) for t in "ab"]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(10)
+        assert p.exitcode == 0
+    lines = log.read_text().split()
+    # each holder's enter/leave pair is adjacent: the other never got in between
+    assert sorted(lines) == ["a+", "a-", "b+", "b-"]
+    assert lines[0][0] == lines[1][0] and lines[2][0] == lines[3][0]
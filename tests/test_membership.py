@@ -0,0 +1,27 @@
+import pandas as pd
+import pytest
+from swing_systems.common.membership import MembershipHistory
+
+def _history(tmp_path):
+    h = MembershipHistory(str(tmp_path / "hist.npz"))
+    h.record("s", "2025-01-02", ["AAA", "bbb"])
+    h.record("s", "2025-01-06", ["BBB", "CCC"])
+    h.save()
+    return MembershipHistory(str(tmp_path / "hist.npz"))
+
+def test_asof_queries(tmp_path):
+    h = _history(tmp_path)
+    assert h.eligible_on("s", "2025-01-03") == ["AAA", "BBB"]
+    assert h.eligible_on("s", "2025-01-01") == []
+    assert h.eligible_between("s", "2025-01-02", "2025-01-06") == ["AAA", "BBB", "CCC"]
+    assert h.eligible_between("s", "2025-01-02", "2025-01-06", how="all") == ["BBB"]
+
+def test_eligible_between_rejects_unknown_how(tmp_path):
+    with pytest.raises(ValueError):
+        _history(tmp_path).eligible_between("s", "2025-01-02", "2025-01-06", how="every")
+
+def test_mask_normalizes_ticker_case(tmp_path):
+    h = _history(tmp_path)
+    df = pd.DataFrame({"Ticker": ["aaa", " BBB", "CCC", "ccc"],
+                       "Date": pd.to_datetime(["2025-01-02", "2025-01-03", "2025-01-03", "2025-01-07"])})
+    assert h.eligible_mask("s", df).tolist() == [True, True, False, True]
@@ -0,0 +1,78 @@
+import argparse
+import datetime as dt
+import json
+import pandas as pd
+import pytest
+from swing_systems.bin.build_data import write_selection
+from swing_systems.bin.pipeline import build_stages, store_current
+from swing_systems.common.pipeline import Stage, run_pipeline
+
+def test_build_data_command_is_date_free(tmp_path):
+    uni = tmp_path / "universe.yaml"
+    uni.write_text("universe: [AAA]\n")
+    args = argparse.Namespace(universe=str(uni), watchlist_dir=str(tmp_path / "wl"), history_days=300,
+                              batch=200, sleep=0.05, top=150, multi=False, lookback=120)
+    stage = next(s for s in build_stages(args) if s.name == "build_data")
+    assert "--start" not in stage.run
+    assert stage.run[stage.run.index("--history-days") + 1] == "300"
+
+
+def _writer(path, calls, fail=False):
+    def run():
+        calls.append(path.name)
+        if fail:
+            raise RuntimeError("boom")
+        path.write_text("x\n")
+    return run
+
+def test_matching_fingerprint_skips_and_missing_output_reruns(tmp_path):
+    state, out, src = str(tmp_path / "state.json"), tmp_path / "out.txt", tmp_path / "in.txt"
+    src.write_text("1\n")
+    calls = []
+    stages = [Stage("a", _writer(out, calls), inputs=[str(src)], outputs=[str(out)])]
+    assert run_pipeline(stages, state) == {"a": "ran"}
+    assert run_pipeline(stages, state) == {"a": "skipped"}
+    out.unlink()
+    assert run_pipeline(stages, state) == {"a": "ran"}
+    src.write_text("2\n")
+    assert run_pipeline(stages, state) == {"a": "ran"}
+    assert len(calls) == 3
+
+def test_failure_blocks_dependents_and_is_not_recorded(tmp_path):
+    state = str(tmp_path / "state.json")
+    calls = []
+    stages = [Stage("a", _writer(tmp_path / "a.txt", calls, fail=True), outputs=[str(tmp_path / "a.txt")]),
+              Stage("b", _writer(tmp_path / "b.txt", calls), deps=["a"]),
+              Stage("c", _writer(tmp_path / "c.txt", calls), deps=["b"]),
+              Stage("d", _writer(tmp_path / "d.txt", calls))]
+    status = run_pipeline(stages, state)
+    assert status == {"a": "failed", "b": "blocked", "c": "blocked", "d": "ran"}
+    assert sorted(calls) == ["a.txt", "d.txt"]
+    assert "a" not in json.loads((tmp_path / "state.json").read_text())
+
+def test_incomplete_stage_reruns_next_time(tmp_path):
+    state, out = str(tmp_path / "state.json"), tmp_path / "out.txt"
+    calls, done = [], [False]
+    stages = [Stage("a", _writer(out, calls), outputs=[str(out)], complete=lambda: done[0])]
+    assert run_pipeline(stages, state) == {"a": "ran"}
+    done[0] = True
+    assert run_pipeline(stages, state) == {"a": "ran"}
+    assert run_pipeline(stages, state) == {"a": "skipped"}
+
+def test_cycles_and_unknown_deps_rejected(tmp_path):
+    noop = lambda: None
+    with pytest.raises(ValueError, match="cycle"):
+        run_pipeline([Stage("a", noop, deps=["b"]), Stage("b", noop, deps=["a"])], str(tmp_path / "s.json"))
+    with pytest.raises(ValueError, match="unknown"):
+        run_pipeline([Stage("a", noop, deps=["zzz"])], str(tmp_path / "s.json"))
+
+def test_store_current_requires_every_selected_ticker_at_target(tmp_path):
+    data, sel = tmp_path / "combined.csv", tmp_path / "selected_tickers.txt"
+    pd.DataFrame({"Ticker": ["AAA", "BBB"], "Date": ["2025-10-17", "2025-10-16"]}).to_csv(data, index=False)
+    target = dt.date(2025, 10, 17)
+    write_selection(sel, target, ["AAA", "BBB"])
+    assert not store_current(str(data), str(sel), target)
+    write_selection(sel, target, ["AAA"])
+    assert store_current(str(data), str(sel), target)
+    write_selection(sel, target, ["AAA", "CCC"])  # never fetched at all
+    assert not store_current(str(data), str(sel), target)
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from swing_systems.common.robustness import bands, period_starts, score, simulate, trade_returns
+
+def _ledger(rets, exits):
+    entry = pd.Timestamp("2025-10-06")
+    return pd.DataFrame({"Status": "closed", "EntryDate": entry, "EntryPrice": 100.0,
+                         "ExitDate": pd.to_datetime(exits), "ExitPrice": 100.0 * (1 + np.asarray(rets))})
+
+def _overlapping(n_lots=10, ret=-0.05):
+    exits = pd.bdate_range("2025-10-07", periods=4)
+    return _ledger([ret] * n_lots, [exits[i % len(exits)] for i in range(n_lots)])
+
+def test_lots_kept_with_exit_day_periods():
+    r, period, years = trade_returns(_overlapping())
+    assert len(r) == 10 and years < 1
+    assert period.tolist() == [0, 0, 0, 1, 1, 1, 2, 2, 3, 3]
+    assert period_starts(period).tolist() == [0, 3, 6, 8]
+
+def test_short_span_reports_total_return_not_annualized():
+    r, period, years = trade_returns(_overlapping())
+    res = bands(r, period, years, n_sims=200, modes=("shuffle",), workers=1, seed=0)
+    total = res.set_index("Metric").loc["TotalReturn", "Observed"]
+    # ten 5% losers at 10% of equity each lose about 5%, not -100% annualized
+    assert -0.06 < total < -0.04
+    assert "CAGR" not in set(res["Metric"])
+
+def test_win_rate_counts_trades_not_days():
+    # one exit day: a big winner and two losers nets positive, but 1 of 3 trades won
+    r, period, years = trade_returns(_ledger([0.30, -0.05, -0.05], ["2025-10-10"] * 3))
+    assert score(r[None, :], period_starts(period), years, 0.1)[2, 0] == 1 / 3
+
+def test_slippage_is_charged_per_lot():
+    # 50 flat lots closing on one day: each pays its own round trip (mean 2 * 10 bps)
+    r, period, years = trade_returns(_ledger([0.0] * 50, ["2025-10-10"] * 50))
+    sims = simulate(r, period, years, "slippage", 2_000, fraction=1.0, slip_bps=10.0, workers=1, seed=0)
+    np.testing.assert_allclose(sims[0].mean(), -50 * 2 * 10 / 1e4, rtol=0.02)
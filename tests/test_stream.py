@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+from swing_systems.bin.build_watchlists import add_features, clean, last_snapshot, stream_snapshots
+from swing_systems.common.io import iter_ticker_frames
+
+def _combined(path, n_tickers=7, n_days=260):
+    rng = np.random.default_rng(1)
+    dates = pd.bdate_range(end="2025-10-17", periods=n_days)
+    frames = []
+    for i in range(n_tickers):
+        c = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, n_days)))
+        frames.append(pd.DataFrame({"Date": dates, "Ticker": f"T{i:02d}", "Open": c, "High": c * 1.02,
+                                    "Low": c * 0.98, "Close": c, "Volume": 3e6}))
+    df = pd.concat(frames, ignore_index=True)
+    df.to_csv(path, index=False)
+    return df
+
+def test_frames_hold_whole_tickers_across_chunk_boundaries(tmp_path):
+    p = tmp_path / "combined.csv"
+    df = _combined(p)
+    # 97-row chunks split every ticker's 260 rows; 3 tickers per frame splits the universe
+    frames = list(iter_ticker_frames(p, tickers_per_frame=3, chunksize=97))
+    assert [f["Ticker"].nunique() for f in frames] == [3, 3, 1]
+    got = pd.concat(frames, ignore_index=True)
+    assert got.groupby("Ticker").size().eq(260).all()
+    pd.testing.assert_frame_equal(got[df.columns], pd.read_csv(p, parse_dates=["Date"], dtype={"Ticker": "string"}))
+
+def test_streamed_snapshots_match_in_memory(tmp_path):
+    p = tmp_path / "combined.csv"
+    _combined(p)
+    cutoff = pd.Timestamp("2025-03-01")
+    streamed = stream_snapshots(str(p), cutoff, tickers_per_frame=2, chunksize=97)
+
+    df = clean(pd.read_csv(p, parse_dates=["Date"], dtype={"Ticker": "string"}))
+    whole = last_snapshot(add_features(df[df["Date"] >= cutoff].copy()))
+    pd.testing.assert_frame_equal(streamed.sort_values("Ticker").reset_index(drop=True),
+                                  whole.sort_values("Ticker").reset_index(drop=True))
+
+def test_non_contiguous_ticker_raises(tmp_path):
+    p = tmp_path / "combined.csv"
+    df = _combined(p, n_tickers=3, n_days=10)
+    pd.concat([df, df[df["Ticker"] == "T00"].head(1)]).to_csv(p, index=False)
+    with pytest.raises(ValueError, match="not contiguous"):
+        list(iter_ticker_frames(p, tickers_per_frame=1, chunksize=4))
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+from swing_systems.common.timeframes import load_bars, resample_bars
+
+def _daily(tickers=("AAA", "BBB", "CCC"), start="2025-01-01", end="2025-04-30"):
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range(start, end)
+    frames = []
+    for t in tickers:
+        c = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(dates))))
+        frames.append(pd.DataFrame({"Date": dates, "Ticker": t, "Open": c, "High": c * 1.01,
+                                    "Low": c * 0.99, "Close": c, "Volume": 1e6}))
+    return pd.concat(frames, ignore_index=True)
+
+def _read(path):
+    return pd.read_csv(path, parse_dates=["PeriodStart", "Date"])
+
+def test_subset_calls_do_not_shrink_shared_cache(tmp_path):
+    d = _daily()
+    cache = str(tmp_path / "bars_1W.csv")
+    load_bars(d, "1W", cache)
+    out = load_bars(d[d["Ticker"] == "AAA"], "1W", cache)
+    assert set(out["Ticker"].astype(str)) == {"AAA"}
+    assert set(_read(cache)["Ticker"]) == {"AAA", "BBB", "CCC"}
+
+def test_lagging_ticker_backfills_per_ticker_cutoff(tmp_path):
+    d = _daily()
+    cache = str(tmp_path / "bars_1W.csv")
+    # AAA is a few weeks behind the others when the cache is first built
+    first = d[(d["Ticker"] != "AAA") | (d["Date"] < "2025-03-12")]
+    first = first[first["Date"] < "2025-04-01"]
+    load_bars(first, "1W", cache)
+    load_bars(d, "1W", cache)
+
+    expected = resample_bars(d, "1W").reset_index(drop=True)
+    got = _read(cache)[expected.columns]
+    pd.testing.assert_frame_equal(expected, got, check_dtype=False)
+
+def test_new_split_rebuilds_that_tickers_cached_bars(tmp_path):
+    from swing_systems.common.adjustments import action_basis, empty_actions
+    d = _daily()
+    cache = str(tmp_path / "bars_1W.csv")
+    load_bars(d, "1W", cache, basis=action_basis(empty_actions(), d["Ticker"].unique()))
+
+    # a 2:1 split in AAA re-adjusts its whole daily history; the others are untouched
+    split = pd.DataFrame({"Ticker": ["AAA"], "Date": [pd.Timestamp("2025-05-01")], "Split": [2.0],
+                          "Dividend": [0.0], "SplitFactor": [0.5], "DivFactor": [1.0]})
+    adj = d.copy()
+    aaa = adj["Ticker"] == "AAA"
+    adj.loc[aaa, ["Open", "High", "Low", "Close"]] *= 0.5
+    bbb_before = _read(cache).query("Ticker == 'BBB'")
+    load_bars(adj, "1W", cache, basis=action_basis(split, adj["Ticker"].unique()))
+
+    expected = resample_bars(adj, "1W").reset_index(drop=True)
+    got = _read(cache)[expected.columns]
+    pd.testing.assert_frame_equal(expected, got, check_dtype=False)
+    pd.testing.assert_frame_equal(bbb_before.reset_index(drop=True),
+                                  _read(cache).query("Ticker == 'BBB'").reset_index(drop=True))
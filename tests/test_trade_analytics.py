@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+import pytest
+from swing_systems.common.io import read_bars
+from swing_systems.common.trade_analytics import BarIndex, SparseTable
+
+def test_query_longer_than_span_raises():
+    st = SparseTable(np.arange(20.0), np.minimum, max_span=4)
+    np.testing.assert_array_equal(st.query([2], [5]), [2.0])
+    with pytest.raises(ValueError):
+        st.query([0], [9])
+
+def test_bar_index_span_covers_longest_ticker():
+    dates = pd.bdate_range("2025-01-01", periods=40)
+    bars = pd.concat([pd.DataFrame({"Ticker": t, "Date": dates[:n], "Low": np.arange(n, 0, -1.0),
+                                    "High": np.arange(n) + 1.0, "Close": 1.0})
+                      for t, n in (("AAA", 40), ("BBB", 5))], ignore_index=True)
+    index = BarIndex(bars)
+    assert index.low.span == 40
+    np.testing.assert_array_equal(index.low.query([0], [39]), [1.0])
+
+def test_read_bars_empty_include_reads_nothing(tmp_path):
+    p = tmp_path / "combined.csv"
+    pd.DataFrame({"Date": ["2025-01-02"], "Ticker": ["AAA"], "Close": [1.0]}).to_csv(p, index=False)
+    assert read_bars(p, include=set()).empty
+    assert len(read_bars(p)) == 1
@@ -0,0 +1,28 @@
+import sys
+import pandas as pd
+from swing_systems.bin import trade_stats
+
+def test_excursions_across_a_split_inside_the_holding_period(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    dates = pd.bdate_range("2025-03-03", periods=8)
+    # as traded: 2:1 split effective on the 5th bar, the lot is held straight through it
+    close = [100.0, 101.0, 98.0, 102.0, 51.0, 52.0, 50.0, 53.0]
+    raw = pd.DataFrame({"Date": dates, "Ticker": "XYZ", "Close": close, "Volume": 1000})
+    raw["Open"], raw["High"], raw["Low"] = raw["Close"], raw["Close"] * 1.01, raw["Close"] * 0.99
+    adjusted = raw.copy()
+    adjusted.loc[:3, ["Open", "High", "Low", "Close"]] *= 0.5
+    (tmp_path / "data").mkdir()
+    adjusted.to_csv("data/combined.csv", index=False)
+    pd.DataFrame({"Ticker": ["XYZ"], "Date": [dates[4]], "Split": [2.0], "Dividend": [0.0],
+                  "SplitFactor": [0.5], "DivFactor": [1.0]}).to_csv("data/adjustments.csv", index=False)
+    (tmp_path / "universe.yaml").write_text("data_path: data/combined.csv\n")
+    (tmp_path / "state").mkdir()
+    pd.DataFrame({"Ticker": ["XYZ"], "EntryDate": [dates[0].date()], "EntryPrice": [100.0], "Status": ["closed"],
+                  "ExitDate": [dates[6].date()], "ExitPrice": [50.0]}).to_csv("state/double_seven_state.csv", index=False)
+
+    monkeypatch.setattr(sys, "argv", ["trade_stats", "--universe", "universe.yaml", "--strategies", "double_seven"])
+    trade_stats.main()
+    ex = pd.read_csv("outputs/double_seven/trades_mae_mfe.csv").iloc[0]
+    assert round(ex["Return"], 6) == 0.0
+    assert round(ex["MAE"], 6) == round(98.0 * 0.99 / 100 - 1, 6)
+    assert round(ex["MFE"], 6) == round(104.0 * 1.01 / 100 - 1, 6)